@@ -0,0 +1,98 @@
+"""Solve many puzzles at once on a pool of worker processes.
+
+    for puzzle, solution in solve_batch(puzzles, processes=32, chunksize=256):
+        ...
+
+Each worker imports sudoku_solver once and loads every puzzle it is given
+into the same Sudoku, so the peer tables and search state are reused; only
+the puzzle strings and the solution strings cross the process boundary.
+puzzles may be any iterable, including a generator over a file: only a few
+chunks per worker are read ahead, so memory use does not grow with the size
+of the input.
+"""
+import collections
+import itertools
+import multiprocessing
+import os
+import queue
+
+from sudoku_solver import Sudoku, solve, result_string
+
+# Sudoku, search settings and input format of the current worker process,
+# set by _init_worker
+_worker_sudoku = None
+_worker_args = {}
+_worker_packed = False
+
+
+def _init_worker(bitset, n, search_args, packed=False):
+    global _worker_sudoku, _worker_args, _worker_packed
+    _worker_sudoku, _worker_args = Sudoku('', bitset=bitset, n=n), search_args
+    _worker_packed = packed
+
+
+def _solve_chunk(chunk):
+    results = []
+    sudoku = _worker_sudoku
+    load = sudoku.load_packed if _worker_packed else sudoku.load
+    for puzzle in chunk:
+        load(puzzle)
+        result = solve(sudoku, **_worker_args)
+        results.append((puzzle, result_string(sudoku, result)))
+    return results
+
+
+def chunked(iterable, size):
+    """Yield lists of up to size consecutive items of iterable."""
+    it = iter(iterable)
+    chunk = list(itertools.islice(it, size))
+    while chunk:
+        yield chunk
+        chunk = list(itertools.islice(it, size))
+
+
+def solve_batch(puzzles, processes=None, chunksize=64, ordered=True, bitset=True,
+                n=3, packed=False, **search_args):
+    """Yield (puzzle, solution) for every puzzle string in puzzles, where
+    solution is None when the puzzle has none and BUDGET_EXCEEDED when a
+    max_nodes or timeout in search_args ran out first.
+    processes   number of workers; None uses every core.
+    chunksize   puzzles sent to a worker at a time; larger chunks cost less
+                in communication, smaller ones balance uneven puzzles better.
+    ordered     if True results come back in input order, otherwise chunk by
+                chunk as each one finishes.
+    bitset, n   are passed on to Sudoku.
+    packed      if True the puzzles are packed grids as bytes, see sudoku_packed.
+    search_args are passed on to solve(), e.g. backend='dlx', and must be
+    picklable: functions have to be defined at module level."""
+    processes = processes or os.cpu_count() or 1
+    max_pending = 2 * processes
+    chunks = chunked(puzzles, chunksize)
+    with multiprocessing.Pool(processes, _init_worker, (bitset, n, search_args, packed)) as pool:
+        if ordered:
+            pending = collections.deque()
+            for chunk in chunks:
+                pending.append(pool.apply_async(_solve_chunk, (chunk,)))
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().get()
+            while pending:
+                yield from pending.popleft().get()
+        else:
+            done = queue.Queue()
+            npending = 0
+            for chunk in chunks:
+                pool.apply_async(_solve_chunk, (chunk,), callback=done.put,
+                                 error_callback=done.put)
+                npending += 1
+                if npending >= max_pending:
+                    yield from _result(done.get())
+                    npending -= 1
+            for _ in range(npending):
+                yield from _result(done.get())
+
+
+def _result(results):
+    """Return the results of a finished chunk, re-raising a worker error."""
+    if isinstance(results, BaseException):
+        raise results
+    return results
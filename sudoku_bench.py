@@ -0,0 +1,161 @@
+"""Benchmark the search heuristics and inference functions.
+
+Every combination of variable order, value order and inference function
+solves the bundled corpora in puzzles/, from easy generated puzzles to the
+hardest known 17-clue ones:
+
+    python sudoku_bench.py -o bench.json
+    python sudoku_bench.py --corpus hard --inference fc --inference singles
+    python sudoku_bench.py --baseline bench.json --tolerance 0.2
+
+For each corpus and configuration it reports the throughput in puzzles per
+second and the p50/p95/p99/max latency of one puzzle. The results can be
+written as JSON and compared against a stored baseline: a configuration
+that got slower by more than the tolerance, or timed out more often, is a
+regression and makes the exit status 1. The random tie-breaking of the
+heuristics is seeded, so node counts are the same from run to run.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+from sudoku_solver import Sudoku, backtracking_search, percentile, BUDGET_EXCEEDED
+from sudoku_cli import SELECT, ORDER, INFERENCE, read_lines, read_puzzles
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'puzzles')
+CORPORA = ('easy', 'medium', 'hard', '17clue')
+
+
+def load_corpus(name):
+    """Return the puzzles of a bundled corpus, or of a file if name is a path."""
+    path = name if os.sep in name or name.endswith('.txt') else \
+        os.path.join(CORPUS_DIR, name + '.txt')
+    return list(read_puzzles(read_lines([path])))
+
+
+def run(puzzles, select, order, inference, timeout=None, repeat=1, seed=0):
+    """Solve puzzles repeat times with one configuration; return a dict of
+    its throughput, latency percentiles, search nodes and timeouts. A puzzle
+    that runs past timeout seconds is given up and counts as taking that long."""
+    random.seed(seed)
+    sudoku = Sudoku('')
+    latencies = []
+    nodes = timeouts = unsolved = 0
+    clock = time.perf_counter
+    for puzzle in itertools.chain.from_iterable(itertools.repeat(puzzles, repeat)):
+        start = clock()
+        sudoku.load(puzzle)
+        result = backtracking_search(sudoku, select, order, inference, timeout=timeout)
+        latencies.append(clock() - start)
+        nodes += sudoku.stats.nodes
+        if result is BUDGET_EXCEEDED:
+            timeouts += 1
+        elif result is None:
+            unsolved += 1
+    latencies.sort()
+    total = sum(latencies)
+    return dict(puzzles=len(latencies), timeouts=timeouts, unsolved=unsolved,
+                nodes=nodes, time=total,
+                throughput=len(latencies) / total if total else None,
+                p50=percentile(latencies, 50), p95=percentile(latencies, 95),
+                p99=percentile(latencies, 99), max=latencies[-1] if latencies else None)
+
+
+def benchmark(corpora=CORPORA, selects=SELECT, orders=ORDER, inferences=INFERENCE,
+              timeout=None, repeat=1, seed=0, limit=None, report=None):
+    """Run every combination of the named heuristics on every corpus and
+    return {'corpus/select/order/inference': run(...)}; report, if given,
+    is called as report(key, result) after each run."""
+    results = {}
+    for corpus in corpora:
+        puzzles = load_corpus(corpus)[:limit]
+        for s, o, i in itertools.product(selects, orders, inferences):
+            key = '/'.join((os.path.splitext(os.path.basename(corpus))[0], s, o, i))
+            results[key] = run(puzzles, SELECT[s], ORDER[o], INFERENCE[i],
+                               timeout, repeat, seed)
+            if report is not None:
+                report(key, results[key])
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """Return a list of (key, reason) for the results that are worse than
+    baseline: a p50 latency or throughput more than tolerance off, or more
+    timeouts. Keys only in one of the two are not compared."""
+    regressions = []
+    for key, new in results.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        if new['timeouts'] > old['timeouts']:
+            regressions.append((key, 'timeouts %d -> %d' % (old['timeouts'], new['timeouts'])))
+            continue
+        if old['p50'] and new['p50'] > old['p50'] * (1 + tolerance):
+            regressions.append((key, 'p50 %.3gs -> %.3gs' % (old['p50'], new['p50'])))
+        if old['throughput'] and new['throughput'] < old['throughput'] / (1 + tolerance):
+            regressions.append((key, 'throughput %.1f/s -> %.1f/s'
+                                % (old['throughput'], new['throughput'])))
+    return regressions
+
+
+def print_row(key, result, file=sys.stdout):
+    """Write one result as a line of the benchmark table."""
+    ms = lambda t: '%9.2f' % (t * 1000) if t is not None else '%9s' % '-'
+    file.write('%-40s %9.1f %s %s %s %s %10d %4d\n' % (
+        key, result['throughput'] or 0, ms(result['p50']), ms(result['p95']),
+        ms(result['p99']), ms(result['max']), result['nodes'], result['timeouts']))
+    file.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the Sudoku search strategies.')
+    parser.add_argument('--corpus', action='append', metavar='NAME',
+                        help='%s or a puzzle file; may be repeated (default: all)'
+                        % ', '.join(CORPORA))
+    parser.add_argument('--select', action='append', choices=SELECT,
+                        help='variable orders to run (default: all)')
+    parser.add_argument('--order', action='append', choices=ORDER,
+                        help='value orders to run (default: all)')
+    parser.add_argument('--inference', action='append', choices=INFERENCE,
+                        help='inference functions to run (default: all)')
+    parser.add_argument('--timeout', type=float, default=1.0,
+                        help='seconds after which a puzzle is given up; 0 for none')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='times each corpus is solved per configuration')
+    parser.add_argument('--limit', type=int, help='puzzles taken from each corpus')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the tie-breaking')
+    parser.add_argument('-o', '--output', help='write the results here as JSON')
+    parser.add_argument('--baseline', help='JSON results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='slowdown allowed against the baseline, as a fraction')
+    args = parser.parse_args(argv)
+
+    sys.stdout.write('%-40s %9s %9s %9s %9s %9s %10s %4s\n' % (
+        'corpus/select/order/inference', 'puzzles/s', 'p50 ms', 'p95 ms',
+        'p99 ms', 'max ms', 'nodes', 'tout'))
+    results = benchmark(args.corpus or CORPORA, args.select or SELECT,
+                        args.order or ORDER, args.inference or INFERENCE,
+                        args.timeout or None, args.repeat, args.seed, args.limit,
+                        report=print_row)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(dict(python=platform.python_version(), timeout=args.timeout,
+                           repeat=args.repeat, seed=args.seed, results=results),
+                      f, indent=1, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        for key, reason in regressions:
+            sys.stderr.write('regression: %s: %s\n' % (key, reason))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
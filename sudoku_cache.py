@@ -0,0 +1,216 @@
+"""Answer isomorphic puzzles from a cache of solutions.
+
+Relabelling the digits, permuting the rows of a band or the columns of a
+stack, permuting the bands or the stacks, and transposing all turn a
+puzzle into one with the same solutions, transformed the same way.
+canonical_form() picks one representative of all these copies, so
+SolutionCache can key solutions on it and answer a copy of a puzzle it has
+seen by mapping the stored solution back instead of searching:
+
+    cache = SolutionCache(maxsize=100000)
+    for puzzle in puzzles:
+        sudoku.load(puzzle)
+        result = cache.solve(sudoku, inference=hidden_singles)
+
+The representative is the smallest grid string, with digits numbered in
+order of first appearance, over the transformations that sort rows, bands,
+columns and stacks by invariants of their clues. Only ties in those
+invariants have to be tried, which for most puzzles leaves a handful of
+candidates; a puzzle with more than max_candidates of them is not cached.
+"""
+import collections
+import itertools
+import math
+
+from sudoku_solver import SearchStats, BUDGET_EXCEEDED, solve
+
+
+def _cells(csp):
+    """Return the clues of csp row by row: 0 for an open cell, else the
+    number of the symbol plus one."""
+    g = csp.geometry
+    cells = []
+    for var in g.variables:
+        domain = csp.domains[var]
+        values = g.values(domain) if csp.bitset else domain
+        cells.append(g.index[values[0]] + 1 if len(values) == 1 else 0)
+    return cells
+
+
+def _count_orders(keys, n):
+    """Return len(_orders(keys, n)) without listing the orders: a run of k
+    equal keys, of lines within a band or of bands, may come in k! orders."""
+    count = 1
+    bands = []
+    for b in range(n):
+        band = sorted(keys[b * n:(b + 1) * n])
+        for _, run in itertools.groupby(band):
+            count *= math.factorial(len(list(run)))
+        bands.append(band)
+    for _, run in itertools.groupby(sorted(bands)):
+        count *= math.factorial(len(list(run)))
+    return count
+
+
+def _orders(keys, n):
+    """Return every order of the N lines (rows or columns) that puts the
+    bands in order of their sorted keys and the lines of each band in order
+    of their keys; lines and bands with equal keys are tried both ways."""
+    bands = []
+    for b in range(n):
+        lines = sorted(range(b * n, (b + 1) * n), key=keys.__getitem__)
+        # Each run of equal keys may come in any order
+        runs = [list(itertools.permutations(run)) for _, run in
+                itertools.groupby(lines, key=keys.__getitem__)]
+        within = [sum(choice, ()) for choice in itertools.product(*runs)]
+        bands.append((tuple(sorted(keys[i] for i in lines)), within))
+    bands.sort(key=lambda band: band[0])
+    band_runs = [list(itertools.permutations(run)) for _, run in
+                 itertools.groupby(bands, key=lambda band: band[0])]
+    orders = []
+    for choice in itertools.product(*band_runs):
+        chosen = sum(choice, ())
+        for lines in itertools.product(*(within for _, within in chosen)):
+            orders.append(sum(lines, ()))
+    return orders
+
+
+def _line_keys(rows, freq, n):
+    """Return (row keys, column keys) of a grid given as a list of rows.
+    They only depend on the clues of each line, the number of times each
+    digit is given and the keys of the crossing lines, so they do not change
+    when the digits are relabelled or the other lines permuted."""
+    N = n * n
+    cols = list(zip(*rows))
+    row0 = [tuple(sorted(freq[d] for d in row if d)) for row in rows]
+    col0 = [tuple(sorted(freq[d] for d in col if d)) for col in cols]
+    row_keys = [(row0[r], tuple(sorted((col0[c], freq[d]) for c, d in enumerate(rows[r]) if d)))
+                for r in range(N)]
+    col_keys = [(col0[c], tuple(sorted((row0[r], freq[d]) for r, d in enumerate(cols[c]) if d)))
+                for c in range(N)]
+    return row_keys, col_keys
+
+
+def canonical_form(csp, max_candidates=512):
+    """Return (key, cells, labels) for the clues of csp, or None if more than
+    max_candidates transformations would have to be compared.
+    key     the canonical grid string, '.' for open cells; isomorphic puzzles
+            have the same key
+    cells   cells[i] is the cell, numbered row by row, of csp that is the
+            i-th cell of key
+    labels  {symbol of csp: symbol of key}, for every symbol"""
+    g = csp.geometry
+    n, N = g.n, g.size
+    grid = _cells(csp)
+    freq = [0] * (N + 1)
+    for d in grid:
+        freq[d] += 1
+    freq[0] = 0
+    rows = [grid[r * N:(r + 1) * N] for r in range(N)]
+    row_keys, col_keys = _line_keys(rows, freq, n)
+    profiles = (sorted(row_keys), sorted(col_keys))
+    # Transposing swaps the keys; take the orientation whose rows come first
+    orientations = []
+    if profiles[0] <= profiles[1]:
+        orientations.append((False, row_keys, col_keys))
+    if profiles[1] <= profiles[0]:
+        orientations.append((True, col_keys, row_keys))
+
+    # Count the candidates first: a sparse board can have far too many to list
+    total = sum(_count_orders(rkeys, n) * _count_orders(ckeys, n)
+                for _, rkeys, ckeys in orientations)
+    if total > max_candidates:
+        return None
+    candidates = [(transposed, _orders(rkeys, n), _orders(ckeys, n))
+                  for transposed, rkeys, ckeys in orientations]
+
+    best = best_cells = None
+    for transposed, row_orders, col_orders in candidates:
+        for row_order in row_orders:
+            for col_order in col_orders:
+                if transposed:
+                    cells = [c * N + r for r in row_order for c in col_order]
+                else:
+                    cells = [r * N + c for r in row_order for c in col_order]
+                # Number the digits in order of first appearance
+                label = [0] * (N + 1)
+                nxt = 1
+                form = []
+                for i in cells:
+                    d = grid[i]
+                    if d and not label[d]:
+                        label[d] = nxt
+                        nxt += 1
+                    form.append(label[d])
+                if best is None or form < best:
+                    best, best_cells, best_label = form, cells, label
+    # Digits that are never given take the remaining labels in order
+    nxt = max(best_label) + 1
+    for d in range(1, N + 1):
+        if not best_label[d]:
+            best_label[d] = nxt
+            nxt += 1
+    symbols = g.symbols
+    key = ''.join(symbols[d - 1] if d else '.' for d in best)
+    labels = {symbols[d - 1]: symbols[best_label[d] - 1] for d in range(1, N + 1)}
+    return key, best_cells, labels
+
+
+class SolutionCache():
+    """A bounded LRU cache of solutions keyed on canonical_form.
+        hits        puzzles answered from the cache
+        misses      puzzles solved and then stored
+        evictions   entries dropped to stay within maxsize
+        skipped     puzzles with too many candidate forms, solved uncached
+    Puzzles without a solution are cached too; searches that ran out of
+    budget are not."""
+    def __init__(self, maxsize=4096, max_candidates=512):
+        self.maxsize = maxsize
+        self.max_candidates = max_candidates
+        self.entries = collections.OrderedDict()
+        self.hits = self.misses = self.evictions = self.skipped = 0
+
+    def solve(self, csp, backend='csp', **search_args):
+        """Like solve(csp, backend, **search_args), but through the cache.
+        csp.stats is a fresh SearchStats with no nodes after a hit."""
+        form = canonical_form(csp, self.max_candidates)
+        if form is None:
+            self.skipped += 1
+            return solve(csp, backend, **search_args)
+        key, cells, labels = form
+        variables = csp.geometry.variables
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            csp.stats = SearchStats()
+            solution = self.entries[key]
+            if solution is None:
+                return None
+            unlabel = {new: old for old, new in labels.items()}
+            grid = [None] * len(solution)
+            for i, ch in zip(cells, solution):
+                grid[i] = unlabel[ch]
+            return dict(zip(variables, grid))
+
+        self.misses += 1
+        result = solve(csp, backend, **search_args)
+        if result is BUDGET_EXCEEDED:
+            return result
+        if result is None:
+            self.entries[key] = None
+        else:
+            self.entries[key] = ''.join(labels[result[variables[i]]] for i in cells)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return result
+
+    def clear(self):
+        self.entries.clear()
+
+    def as_dict(self):
+        return dict(size=len(self.entries), hits=self.hits, misses=self.misses,
+                    evictions=self.evictions, skipped=self.skipped)
+
+    def __repr__(self):
+        return 'SolutionCache(%s)' % ', '.join('%s=%r' % kv for kv in self.as_dict().items())
@@ -0,0 +1,209 @@
+"""Command-line batch solver.
+
+Reads puzzles one per line from files or stdin and writes one solution line
+per puzzle as soon as it is found, so memory use does not depend on the size
+of the input:
+
+    python sudoku_cli.py puzzles.txt > solutions.txt
+    cat puzzles.txt | python sudoku_cli.py --select first --order unordered
+    python sudoku_cli.py -j 32 --chunksize 256 big.txt > solutions.txt
+    python sudoku_cli.py --vectorised --batch-size 4096 big.txt > solutions.txt
+    python sudoku_cli.py --stats hard.txt 2> stats.ndjson > solutions.txt
+    python sudoku_cli.py --timeout 0.5 --restart-unit 100 --select mrv --inference singles hard.txt
+    python sudoku_cli.py --cache 100000 --stats reported.txt > solutions.txt
+    python sudoku_cli.py --packed -j 32 archive.sdkp > solutions.txt
+
+Blank lines and lines starting with '#' are skipped. With --packed the files
+are packed corpora, read through a memory map; see sudoku_packed. A puzzle without a
+solution is written as '-', and one whose search ran out of --max-nodes or
+--timeout before it was done as '?'. With --stats the SearchStats of every puzzle
+go to stderr as one JSON object per line, followed by the counters of the
+--cache if there is one.
+"""
+import argparse
+import functools
+import json
+import sys
+
+from sudoku_solver import (Sudoku, solve, result_string, BUDGET_EXCEEDED,
+                           first_unassigned_variable, minimum_remaining_values,
+                           incremental_mrv, unordered_domain_values,
+                           least_constraining_value, least_eliminating_value,
+                           no_inference, forward_checking, mac, hidden_singles,
+                           naked_pairs)
+from sudoku_batch import solve_batch
+
+
+SELECT = {'mrv': minimum_remaining_values, 'first': first_unassigned_variable,
+          'incremental': incremental_mrv}
+ORDER = {'lcv': least_constraining_value, 'unordered': unordered_domain_values,
+         'eliminating': least_eliminating_value}
+INFERENCE = {'fc': forward_checking, 'none': no_inference, 'mac': mac,
+             'singles': hidden_singles, 'pairs': naked_pairs}
+
+
+def read_lines(paths):
+    """Yield the lines of each file in paths in turn; '-' is stdin."""
+    for path in paths:
+        if path == '-':
+            yield from sys.stdin
+        else:
+            with open(path) as f:
+                yield from f
+
+
+def read_puzzles(lines):
+    """Yield the puzzle strings in lines, skipping blanks and comments."""
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line
+
+
+def solve_all(puzzles, bitset=True, n=3, backend='csp', report=None, cache=None,
+              packed=False, **search_args):
+    """Yield (puzzle, solution) for each puzzle; solution is None if there is
+    none and BUDGET_EXCEEDED if the search ran out of budget.
+    One Sudoku is loaded with each puzzle in turn, so its tables are reused.
+    report, if given, is called as report(puzzle, stats) after each solve.
+    cache, a SolutionCache, answers puzzles isomorphic to earlier ones.
+    With packed=True the puzzles are packed grids, e.g. from a PackedCorpus."""
+    sudoku = Sudoku('', bitset=bitset, n=n)
+    load = sudoku.load_packed if packed else sudoku.load
+    for puzzle in puzzles:
+        load(puzzle)
+        if cache is not None:
+            result = cache.solve(sudoku, backend, **search_args)
+        else:
+            result = solve(sudoku, backend, **search_args)
+        if report is not None:
+            report(puzzle, sudoku.stats)
+        yield puzzle, result_string(sudoku, result)
+
+
+def write_stats(puzzle, stats):
+    """Write the SearchStats of a solved puzzle to stderr as a JSON line."""
+    sys.stderr.write(json.dumps(dict(puzzle=puzzle, **stats.as_dict())) + '\n')
+
+
+def read_packed(paths, n=3, copy=False):
+    """Yield the puzzles of each packed corpus in paths in turn, as views
+    of the mapped file or, with copy=True, as bytes that can be pickled."""
+    from sudoku_packed import PackedCorpus
+    for path in paths:
+        with PackedCorpus(path) as corpus:
+            if corpus.n != n:
+                raise ValueError("Packed corpus of another box size", path, corpus.n)
+            if copy:
+                yield from map(bytes, corpus)
+            else:
+                yield from corpus
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Solve Sudoku puzzles, one per line.')
+    parser.add_argument('files', nargs='*', default=['-'],
+                        help="puzzle files; '-' or nothing reads stdin")
+    parser.add_argument('-o', '--output', help='write solutions here instead of stdout')
+    parser.add_argument('--backend', choices=('csp', 'dlx'), default='csp',
+                        help='backtracking CSP search or exact cover with dancing links')
+    parser.add_argument('--select', choices=SELECT,
+                        help='variable order (default: incremental, or mrv with --restart-unit)')
+    parser.add_argument('--order', choices=ORDER, default='lcv')
+    parser.add_argument('--inference', choices=INFERENCE, default='fc')
+    parser.add_argument('-n', '--box-size', type=int, default=3,
+                        help='box size from 2 to 5: 3 for 9x9 puzzles, 4 for 16x16, 5 for 25x25')
+    parser.add_argument('--packed', action='store_true',
+                        help='the files are packed corpora made by sudoku_packed.py')
+    parser.add_argument('--lists', action='store_true',
+                        help='use list domains instead of bitsets')
+    parser.add_argument('--echo', action='store_true',
+                        help='write "puzzle solution" instead of the solution alone')
+    parser.add_argument('-j', '--processes', type=int, default=1,
+                        help='worker processes; 0 uses every core')
+    parser.add_argument('--chunksize', type=int, default=64,
+                        help='puzzles handed to a worker at a time')
+    parser.add_argument('--unordered', action='store_true',
+                        help='with several workers, write solutions as they finish')
+    parser.add_argument('--vectorised', action='store_true',
+                        help='propagate whole batches with NumPy before searching')
+    parser.add_argument('--batch-size', type=int, default=4096,
+                        help='puzzles per batch with --vectorised')
+    parser.add_argument('--max-nodes', type=int,
+                        help='give up on a puzzle after this many search nodes')
+    parser.add_argument('--timeout', type=float,
+                        help='give up on a puzzle after this many seconds')
+    parser.add_argument('--restart-unit', type=int,
+                        help='restart the search on a Luby schedule of this many nodes')
+    parser.add_argument('--cache', type=int, metavar='SIZE',
+                        help='answer puzzles isomorphic to one of the last SIZE solved from a cache')
+    parser.add_argument('--stats', action='store_true',
+                        help='write the search statistics of each puzzle to stderr')
+    args = parser.parse_args(argv)
+    if args.vectorised and (args.processes != 1 or args.lists):
+        parser.error('--vectorised runs in one process on bitset domains')
+    if args.stats and (args.processes != 1 or args.vectorised):
+        parser.error('--stats needs a single process without --vectorised')
+    if args.packed and (args.vectorised or '-' in args.files):
+        parser.error('--packed reads files, without --vectorised')
+    if args.cache and (args.processes != 1 or args.vectorised):
+        parser.error('--cache needs a single process without --vectorised')
+    if args.backend != 'csp' and (args.max_nodes or args.timeout or args.restart_unit):
+        parser.error('--max-nodes, --timeout and --restart-unit need --backend csp')
+    if args.select is None:
+        args.select = 'mrv' if args.restart_unit else 'incremental'
+    elif args.restart_unit and args.select != 'mrv':
+        parser.error('--restart-unit needs --select mrv, which breaks ties at random')
+
+    out = open(args.output, 'w') if args.output else sys.stdout
+    cache = None
+    try:
+        search_args = dict(backend=args.backend,
+                           select_unassigned_variable=SELECT[args.select],
+                           order_domain_values=ORDER[args.order],
+                           inference=INFERENCE[args.inference])
+        if args.backend == 'csp':
+            search_args.update(max_nodes=args.max_nodes, timeout=args.timeout,
+                               restart_unit=args.restart_unit)
+            if args.stats:
+                search_args['profile'] = True
+        if args.packed:
+            from sudoku_packed import unpack
+            puzzles = read_packed(args.files, args.box_size, copy=args.processes != 1)
+            text = functools.partial(unpack, n=args.box_size)
+            search_args['packed'] = True
+        else:
+            puzzles = read_puzzles(read_lines(args.files))
+            text = str
+        if args.vectorised:
+            from sudoku_numpy import solve_vectorised
+            results = solve_vectorised(puzzles, n=args.box_size, batch=args.batch_size,
+                                       **search_args)
+        elif args.processes == 1:
+            if args.cache:
+                from sudoku_cache import SolutionCache
+                cache = SolutionCache(args.cache)
+            results = solve_all(puzzles, bitset=not args.lists, n=args.box_size,
+                                report=(lambda puzzle, stats: write_stats(text(puzzle), stats))
+                                if args.stats else None,
+                                cache=cache, **search_args)
+        else:
+            results = solve_batch(puzzles, processes=args.processes or None,
+                                  chunksize=args.chunksize, ordered=not args.unordered,
+                                  bitset=not args.lists, n=args.box_size, **search_args)
+        unsolved = 0
+        for puzzle, solution in results:
+            if solution is None or solution is BUDGET_EXCEEDED:
+                unsolved += 1
+                solution = '-' if solution is None else '?'
+            out.write(f'{text(puzzle)} {solution}\n' if args.echo else solution + '\n')
+        if args.stats and cache is not None:
+            sys.stderr.write(json.dumps(dict(cache=cache.as_dict())) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 1 if unsolved else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
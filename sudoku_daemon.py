@@ -0,0 +1,323 @@
+"""A long-running solver that answers newline-delimited JSON requests.
+
+Starting a process per puzzle pays for the interpreter and the imports
+every time; the daemon pays once and keeps a pool of warm worker
+processes, each with a Sudoku per board size that is reloaded for every
+puzzle. It listens on a Unix socket, or on stdin/stdout:
+
+    python sudoku_daemon.py --socket /tmp/sudoku.sock -j 8 --max-inflight 32
+    echo '{"id": 1, "puzzle": "..53.....8......2..7..1.5..4...."}' | python sudoku_daemon.py
+
+Each line is a JSON object and gets one line back, carrying the same id;
+responses come back as puzzles finish, not necessarily in order.
+    {"id": 1, "puzzle": "...", "timeout": 0.5}
+        optional keys: n, backend, select, order, inference, max_nodes
+        (names as for sudoku_cli) and timeout in seconds, which counts from
+        when the request is read and so includes time spent waiting
+    -> {"id": 1, "status": "solved", "solution": "...", "nodes": 120, "time": 0.004}
+       status is one of solved, unsolvable, timeout or error; an error,
+       from a bad request or a failed worker, carries the reason in "error"
+    {"id": 2, "op": "stats"}
+    -> {"id": 2, "status": "ok", "stats": {"requests": ..., "inflight": ...,
+        "waiting": ..., "p50": ..., ...}}
+
+At most max_inflight requests are solved at a time. A connection reads
+one request ahead and waits for a free slot before it reads the next, so
+a client that sends faster than the workers solve is held back by its
+socket buffer instead of by a queue growing in the daemon, and an idle
+connection holds no slot. A request answered as timed out while its
+worker is still busy keeps its slot until the worker is done.
+"""
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import json
+import os
+import signal
+import sys
+import threading
+import time
+
+from sudoku_solver import (Sudoku, solve, result_string, percentile, BUDGET_EXCEEDED,
+                           MAX_BOX_SIZE)
+from sudoku_cli import SELECT, ORDER, INFERENCE
+
+# Sudoku of each board size in the current worker process, by box size
+_worker_sudokus = {}
+
+
+def _solve_request(puzzle, n, backend, search_args):
+    """Solve one puzzle in a worker; return (solution, nodes) where solution
+    is a grid string, None or BUDGET_EXCEEDED."""
+    sudoku = _worker_sudokus.get(n)
+    if sudoku is None:
+        sudoku = _worker_sudokus[n] = Sudoku('', n=n)
+    sudoku.load(puzzle)
+    result = solve(sudoku, backend, **search_args)
+    return result_string(sudoku, result), sudoku.stats.nodes
+
+
+def _warm_up():
+    _worker_sudokus.setdefault(3, Sudoku(''))
+    return os.getpid()
+
+
+class SolverDaemon():
+    """Dispatches requests to a process pool, at most max_inflight at once.
+    processes=0 solves in a thread of this process instead, which is slower
+    but handy for trying the daemon out. timeout is the default per-request
+    timeout in seconds; None leaves requests without one."""
+    def __init__(self, processes=None, max_inflight=None, timeout=None, history=1000):
+        self.processes = (os.cpu_count() or 1) if processes is None else processes
+        self.max_inflight = max_inflight or 2 * max(self.processes, 1)
+        self.timeout = timeout
+        self.executor = None
+        self.slots = None
+        self.inflight = self.waiting = 0
+        self.counts = collections.Counter()
+        # Latencies of the last history requests, for the percentiles
+        self.latencies = collections.deque(maxlen=history)
+
+    async def start(self):
+        """Start the workers and wait until each one is up."""
+        if self.processes:
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                self.processes, initializer=_warm_up)
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(loop.run_in_executor(self.executor, _warm_up)
+                                   for _ in range(self.processes)))
+        else:
+            self.executor = concurrent.futures.ThreadPoolExecutor(1)
+        self.slots = asyncio.Semaphore(self.max_inflight)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    def stats(self):
+        """Return the counters, queue depth and latency percentiles; waiting
+        is the number of requests read and waiting for a slot."""
+        latencies = sorted(self.latencies)
+        return dict(self.counts, inflight=self.inflight, waiting=self.waiting,
+                    processes=self.processes, max_inflight=self.max_inflight,
+                    p50=percentile(latencies, 50), p95=percentile(latencies, 95),
+                    p99=percentile(latencies, 99), max=latencies[-1] if latencies else None)
+
+    async def acquire(self):
+        """Wait for a free slot; release it with self.slots.release()."""
+        self.waiting += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+
+    async def handle(self, request, received):
+        """Answer one decoded request that was read at time received, holding
+        a slot that is released when the answer is ready, or when its worker
+        is done if that is later."""
+        work = None
+        try:
+            if request.get('op', 'solve') == 'stats':
+                return dict(status='ok', stats=self.stats())
+            response, work = await self.solve(request, received)
+            return response
+        except Exception as e:
+            # A bad request; failures in the workers are answered by solve
+            self.counts['error'] += 1
+            return dict(status='error', error=repr(e))
+        finally:
+            if work is None or work.done():
+                self.slots.release()
+            else:
+                work.add_done_callback(self.release_after)
+
+    def release_after(self, work):
+        """Free the slot of work that finished after its request was answered."""
+        self.slots.release()
+        if not work.cancelled():
+            work.exception()  # Already answered; only mark it retrieved
+
+    async def solve(self, request, received):
+        """Return the answer to a solve request, and the future of its work
+        if the answer came before the worker finished, else None."""
+        puzzle = request['puzzle']
+        if not isinstance(puzzle, str):
+            raise TypeError("puzzle must be a string")
+        n = request.get('n', 3)
+        if type(n) is not int or not 2 <= n <= MAX_BOX_SIZE:
+            raise ValueError("Unsupported box size", n)
+        backend = request.get('backend', 'csp')
+        search_args = {}
+        if backend == 'csp':
+            search_args = dict(
+                select_unassigned_variable=SELECT[request.get('select', 'incremental')],
+                order_domain_values=ORDER[request.get('order', 'lcv')],
+                inference=INFERENCE[request.get('inference', 'fc')],
+                max_nodes=request.get('max_nodes'))
+        elif backend != 'dlx':
+            raise ValueError("Unknown backend", backend)
+        timeout = request.get('timeout', self.timeout)
+        self.counts['requests'] += 1
+        self.inflight += 1
+        try:
+            if timeout is not None:
+                remaining = received + timeout - time.perf_counter()
+                if remaining <= 0:
+                    return self.answer('timeout', received), None
+                # The search gives itself up at the deadline, so the worker
+                # is free again; wait_for only guards against the dlx backend
+                search_args['timeout'] = remaining
+            loop = asyncio.get_running_loop()
+            work = loop.run_in_executor(self.executor, _solve_request, puzzle,
+                                        n, backend, search_args)
+            try:
+                # shield: the worker cannot be stopped, so the future is
+                # left to finish and tell handle when it has
+                solution, nodes = await asyncio.wait_for(
+                    asyncio.shield(work), None if timeout is None else remaining + 1.0)
+            except asyncio.TimeoutError:
+                return self.answer('timeout', received), work
+            except Exception as e:
+                # Whatever went wrong in the worker, including a broken
+                # pool, is this request's answer and not the connection's
+                return self.answer('error', received, error=repr(e)), None
+        finally:
+            self.inflight -= 1
+        if solution is BUDGET_EXCEEDED:
+            return self.answer('timeout', received, nodes=nodes), None
+        if solution is None:
+            return self.answer('unsolvable', received, nodes=nodes), None
+        return self.answer('solved', received, solution=solution, nodes=nodes), None
+
+    def answer(self, status, received, **fields):
+        elapsed = time.perf_counter() - received
+        self.counts[status] += 1
+        self.latencies.append(elapsed)
+        return dict(status=status, time=elapsed, **fields)
+
+    async def serve(self, reader, writer):
+        """Answer the requests read from reader on writer until end of input."""
+        lock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(request_id, request, received):
+            response = dict(id=request_id, **await self.handle(request, received))
+            async with lock:
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                received = time.perf_counter()
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("request must be a JSON object")
+                except ValueError as e:
+                    self.counts['error'] += 1
+                    async with lock:
+                        writer.write(json.dumps(dict(id=None, status='error', error=repr(e)))
+                                     .encode() + b'\n')
+                        await writer.drain()
+                    continue
+                # Backpressure: read no further until a slot is free
+                await self.acquire()
+                task = asyncio.create_task(respond(request.get('id'), request, received))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def serve_unix(self, path):
+        """Serve every client that connects to the Unix socket at path."""
+        server = await asyncio.start_unix_server(self.serve, path)
+        async with server:
+            await server.serve_forever()
+
+    async def serve_stdio(self):
+        """Serve the requests on stdin, answering on stdout."""
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        try:
+            await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader),
+                                         sys.stdin)
+        except ValueError:
+            # stdin is a regular file, which the event loop cannot watch
+            threading.Thread(target=_feed, args=(loop, reader, sys.stdin.buffer),
+                             daemon=True).start()
+        await self.serve(reader, _StdoutWriter(sys.stdout.buffer))
+
+
+def _feed(loop, reader, f):
+    """Pass the lines of file f to reader from another thread."""
+    for line in f:
+        loop.call_soon_threadsafe(reader.feed_data, line)
+    loop.call_soon_threadsafe(reader.feed_eof)
+
+
+class _StdoutWriter():
+    """The part of asyncio.StreamWriter that serve uses, writing to a file
+    object; a slow reader of stdout blocks the daemon, which is the
+    backpressure that stdout can give."""
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, data):
+        self.f.write(data)
+
+    async def drain(self):
+        self.f.flush()
+
+    def close(self):
+        self.f.flush()
+
+
+async def run(daemon, socket_path=None):
+    # Stop on SIGTERM as on Ctrl-C, so that the socket file is removed
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    await daemon.start()
+    try:
+        if socket_path:
+            await daemon.serve_unix(socket_path)
+        else:
+            await daemon.serve_stdio()
+    finally:
+        daemon.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve Sudoku solves as newline-delimited JSON.')
+    parser.add_argument('--socket', help='listen on this Unix socket instead of stdin/stdout')
+    parser.add_argument('-j', '--processes', type=int,
+                        help='worker processes (default: every core); 0 solves in-process')
+    parser.add_argument('--max-inflight', type=int,
+                        help='requests solved at once (default: twice the workers)')
+    parser.add_argument('--timeout', type=float,
+                        help='default per-request timeout in seconds')
+    args = parser.parse_args(argv)
+
+    daemon = SolverDaemon(args.processes, args.max_inflight, args.timeout)
+    try:
+        asyncio.run(run(daemon, args.socket))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    finally:
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""Exact-cover backend: Knuth's Algorithm X with dancing links.
+
+A Sudoku with N symbols is the exact-cover problem with 4*N*N constraint
+columns (each cell holds one symbol; each row, column and box holds each
+symbol once) and one matrix row per candidate (cell, symbol), N**3 in all;
+for 9x9 that is 324 columns x 729 rows. Candidates outside a cell's domain
+are left out, so clues are rows that must be chosen. Columns are picked by
+Knuth's smallest-size heuristic.
+
+Select it with solve(sudoku, backend='dlx') from sudoku_solver.
+"""
+import functools
+
+import time
+
+from sudoku_solver import SearchStats, geometry
+
+
+@functools.lru_cache(maxsize=None)
+def _cell_units(n):
+    """Return (row, col, box) indices of every cell of a board with n x n boxes."""
+    g = geometry(n)
+    units = [[0, 0, 0] for _ in range(g.ncells)]
+    for kind, lines in enumerate((g.rows, g.cols, g.boxes)):
+        for i, line in enumerate(lines):
+            for v in line:
+                units[v][kind] = i
+    return [tuple(u) for u in units]
+
+
+def dlx_search(csp):
+    """Solve a Sudoku by exact cover; return {var: value} like
+    backtracking_search, or None if there is no solution. The puzzle is read
+    from csp.domains. csp.nassigns counts the candidates chosen and csp.stats
+    is a SearchStats whose nodes, backtracks and max_depth count column
+    choices, rows taken back and rows chosen at once."""
+    stats = csp.stats = SearchStats()
+    begin = time.perf_counter()
+    g = csp.geometry
+    N, ncells = g.size, g.ncells
+    ncols = 4 * ncells
+
+    # Node 0 is the root and nodes 1..ncols the column headers; every node
+    # x has links L, R, U, D, its column C[x] and, for row nodes, the
+    # candidate ROW[x]. S[c] is the number of rows left in column c.
+    L = [ncols] + list(range(ncols))
+    R = list(range(1, ncols + 1)) + [0]
+    U = list(range(ncols + 1))
+    D = list(range(ncols + 1))
+    C = list(range(ncols + 1))
+    S = [0] * (ncols + 1)
+    ROW = [None] * (ncols + 1)
+
+    cell_units = _cell_units(g.n)
+    for var in range(ncells):
+        domain = csp.domains[var]
+        values = g.values(domain) if csp.bitset else domain
+        r, c, b = cell_units[var]
+        for value in values:
+            d = g.index[value]
+            first = len(C)
+            for k, col in enumerate((1 + var,
+                                     1 + ncells + r * N + d,
+                                     1 + 2 * ncells + c * N + d,
+                                     1 + 3 * ncells + b * N + d)):
+                x = first + k
+                C.append(col)
+                ROW.append((var, value))
+                U.append(U[col])
+                D.append(col)
+                D[U[col]] = x
+                U[col] = x
+                S[col] += 1
+                L.append(x - 1 if k else first + 3)
+                R.append(x + 1 if k < 3 else first)
+
+    def cover(c):
+        L[R[c]] = L[c]
+        R[L[c]] = R[c]
+        i = D[c]
+        while i != c:
+            j = R[i]
+            while j != i:
+                U[D[j]] = U[j]
+                D[U[j]] = D[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def uncover(c):
+        i = U[c]
+        while i != c:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                U[D[j]] = j
+                D[U[j]] = j
+                j = L[j]
+            i = U[i]
+        L[R[c]] = c
+        R[L[c]] = c
+
+    solution = []
+
+    def search():
+        stats.nodes += 1
+        if len(solution) > stats.max_depth:
+            stats.max_depth = len(solution)
+        if R[0] == 0:
+            return True
+        # The column with the fewest rows left
+        c = j = R[0]
+        while j:
+            if S[j] < S[c]:
+                c = j
+                if not S[c]:
+                    return False
+            j = R[j]
+        if not S[c]:
+            return False
+        cover(c)
+        r = D[c]
+        while r != c:
+            solution.append(r)
+            csp.nassigns += 1
+            j = R[r]
+            while j != r:
+                cover(C[j])
+                j = R[j]
+            if search():
+                return True
+            solution.pop()
+            stats.backtracks += 1
+            j = L[r]
+            while j != r:
+                uncover(C[j])
+                j = L[j]
+            r = D[r]
+        uncover(c)
+        return False
+
+    found = search()
+    stats.time = time.perf_counter() - begin
+    if not found:
+        return None
+    chosen = dict(ROW[r] for r in solution)
+    return {var: chosen[var] for var in csp.variables}
@@ -0,0 +1,89 @@
+"""Generate puzzles that have exactly one solution.
+
+A random solved grid is emptied cell by cell in random order; a clue stays
+removed only if count_solutions still finds a single solution. One Sudoku
+is reloaded for every check, so the thousands of counts a puzzle needs
+share their tables, domains and trail.
+
+    python sudoku_generator.py -k 100 --seed 1 > puzzles.txt
+"""
+import argparse
+import random
+import sys
+
+from sudoku_solver import (Sudoku, geometry, backtracking_search, count_solutions,
+                           incremental_mrv, unordered_domain_values, hidden_singles,
+                           naked_pairs)
+
+
+def random_solution(n=3, rng=random):
+    """Return a random solved grid with n x n boxes, row by row."""
+    def shuffled_values(var, assignment, csp):
+        values = list(unordered_domain_values(var, assignment, csp))
+        rng.shuffle(values)
+        return values
+
+    sudoku = Sudoku('', n=n)
+    result = backtracking_search(sudoku, incremental_mrv, shuffled_values, hidden_singles)
+    return sudoku.grid_string(result)
+
+
+def generate(n=3, rng=random, symmetric=False, min_clues=0):
+    """Return (puzzle, solution) where puzzle has a unique solution and no
+    clue can be taken out without losing that, unless taking it out would
+    leave fewer than min_clues. With symmetric=True clues are removed in
+    pairs that are symmetric about the centre of the grid.
+    rng is anything with shuffle(), e.g. random.Random(seed)."""
+    g = geometry(n)
+    solution = random_solution(n, rng)
+    # masks[var] is the domain of var in the current puzzle
+    masks = [0] * g.ncells
+    for ch, var in zip(solution, g.variables):
+        masks[var] = g.bit[ch]
+
+    sudoku = Sudoku('', n=n)
+    clues = g.ncells
+    order = list(range(g.ncells))
+    rng.shuffle(order)
+    for i in order:
+        group = {i, g.ncells - 1 - i} if symmetric else {i}
+        cells = [g.variables[j] for j in group if masks[g.variables[j]] != g.all]
+        if not cells or clues - len(cells) < min_clues:
+            continue
+        saved = [masks[var] for var in cells]
+        for var in cells:
+            masks[var] = g.all
+        sudoku.load_domains(masks)
+        if count_solutions(sudoku, 2, inference=naked_pairs) == 1:
+            clues -= len(cells)
+        else:
+            for var, mask in zip(cells, saved):
+                masks[var] = mask
+
+    puzzle = ''.join(ch if masks[var] != g.all else '.'
+                     for ch, var in zip(solution, g.variables))
+    return puzzle, solution
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate Sudoku puzzles with a unique solution.')
+    parser.add_argument('-k', '--count', type=int, default=1, help='number of puzzles')
+    parser.add_argument('-n', '--box-size', type=int, default=3)
+    parser.add_argument('--seed', type=int, help='seed for reproducible output')
+    parser.add_argument('--symmetric', action='store_true',
+                        help='remove clues in pairs symmetric about the centre')
+    parser.add_argument('--min-clues', type=int, default=0,
+                        help='stop removing clues at this many')
+    parser.add_argument('--solutions', action='store_true',
+                        help='write "puzzle solution" instead of the puzzle alone')
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    for _ in range(args.count):
+        puzzle, solution = generate(args.box_size, rng, args.symmetric, args.min_clues)
+        sys.stdout.write(f'{puzzle} {solution}\n' if args.solutions else puzzle + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""Vectorised propagation over a whole batch of puzzles with NumPy.
+
+A batch of B puzzles becomes a (B, ncells) array of candidate bitmasks,
+one column per variable. propagate() removes the values of single cells
+from their units and places hidden singles for every grid at once, round
+after round, until no grid changes. Grids that come out solved or
+contradictory need no search; only the rest are loaded into a Sudoku and
+handed to solve():
+
+    for puzzle, solution in solve_vectorised(puzzles, batch=4096):
+        ...
+
+NumPy is only needed by this module.
+"""
+import functools
+
+import numpy as np
+
+from sudoku_solver import Sudoku, geometry, solve, result_string
+from sudoku_batch import chunked
+
+_IGNORED = 255
+
+
+@functools.lru_cache(maxsize=None)
+def _tables(n):
+    """Return the lookup tables of a board with n x n boxes:
+    dtype       unsigned int type wide enough for a mask
+    codes       byte -> symbol number, 0 for an open cell, _IGNORED otherwise
+    units       (nunits, N) array of the variables of each unit
+    kinds       the units split into boxes, rows and columns, each a
+                partition of the cells, as (slice of units, cells in order)
+    cell_units  (ncells, 3) array of the units of each variable
+    symbols     (N,) array of the symbol bytes"""
+    g = geometry(n)
+    dtype = np.uint16 if g.size <= 16 else np.uint32 if g.size <= 32 else np.uint64
+    codes = np.full(256, _IGNORED, np.uint8)
+    codes[ord('.')] = codes[ord('0')] = 0
+    for i, d in enumerate(g.symbols):
+        codes[ord(d)] = i + 1
+        if g.casefold:
+            codes[ord(d.lower())] = i + 1
+    units = np.array(g.units, np.intp)
+    N = g.size
+    kinds = [(slice(k * N, (k + 1) * N), units[k * N:(k + 1) * N].ravel()) for k in range(3)]
+    cell_units = np.array([[i for i, unit in enumerate(g.units) if v in unit]
+                           for v in range(g.ncells)], np.intp)
+    symbols = np.frombuffer(g.symbols.encode(), np.uint8)
+    return dtype, codes, units, kinds, cell_units, symbols
+
+
+def popcount(a):
+    """Return the number of bits set in each element of the unsigned array a."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(a)
+    a = a.astype(np.uint64)
+    count = np.zeros(a.shape, np.uint8)
+    while a.any():
+        count += (a & 1).astype(np.uint8)
+        a >>= 1
+    return count
+
+
+def grid_masks(puzzles, n=3):
+    """Return the (len(puzzles), ncells) array of candidate masks of puzzle
+    strings in the format Sudoku accepts, one column per variable."""
+    g = geometry(n)
+    dtype, codes, _, _, _, _ = _tables(n)
+    if all(len(p) == g.ncells for p in puzzles):
+        # Fixed-width lines: decode the whole batch in one go
+        cells = codes[np.frombuffer(''.join(puzzles).encode('latin-1', 'replace'),
+                                    np.uint8)].reshape(len(puzzles), g.ncells)
+        if (cells == _IGNORED).any():
+            cells = None
+    else:
+        cells = None
+    if cells is None:
+        cells = np.zeros((len(puzzles), g.ncells), np.uint8)
+        for i, p in enumerate(puzzles):
+            row = codes[np.frombuffer(p.encode('latin-1', 'replace'), np.uint8)]
+            row = row[row != _IGNORED]
+            if len(row) not in (0, g.ncells):
+                raise ValueError("Not a Sudoku grid", p)  # Too few or too many squares
+            cells[i, :len(row)] = row
+    one = dtype(1)
+    shift = np.maximum(cells, 1).astype(dtype) - one
+    row_masks = np.where(cells > 0, one << shift, dtype(g.all))
+    masks = np.empty_like(row_masks)
+    masks[:, g.variables] = row_masks
+    return masks
+
+
+def propagate(masks, n=3, hidden=True):
+    """Prune a batch of grids to a fixpoint of naked and hidden singles.
+    Return (masks, ok); ok[i] is False when grid i has a contradiction, in
+    which case it has no solution. The input array is not modified."""
+    g = geometry(n)
+    dtype, _, units, kinds, cell_units, _ = _tables(n)
+    full = dtype(g.all)
+    masks = masks.copy()
+    ok = np.ones(len(masks), bool)
+    active = np.arange(len(masks))
+    while len(active):
+        work = masks[active]
+        good = np.ones(len(work), bool)
+        # Naked singles: remove every single value from the rest of its units
+        single = (work & (work - dtype(1))) == 0
+        singles = np.where(single, work, dtype(0))
+        in_units = singles[:, units]
+        unit_or = np.bitwise_or.reduce(in_units, axis=2)
+        good &= (popcount(in_units).sum(axis=2) == popcount(unit_or)).all(axis=1)
+        elim = np.bitwise_or.reduce(unit_or[:, cell_units], axis=2)
+        new = np.where(single, work, work & ~elim)
+        # Hidden singles: a value with one place left in a unit goes there
+        if hidden:
+            in_units = new[:, units]
+            once = np.zeros(in_units.shape[:2], dtype)
+            twice = np.zeros_like(once)
+            for k in range(g.size):
+                m = in_units[:, :, k]
+                twice |= once & m
+                once |= m
+            good &= (once == full).all(axis=1)
+            h = in_units & (once & ~twice)[:, :, None]
+            good &= ((h & (h - dtype(1))) == 0).all(axis=(1, 2))
+            for units_of_kind, cells in kinds:
+                placed = np.zeros_like(new)
+                placed[:, cells] = h[:, units_of_kind, :].reshape(len(new), -1)
+                new = np.where(placed != 0, placed, new)
+        good &= (new != 0).all(axis=1)
+        ok[active] &= good
+        masks[active] = new
+        changed = (new != work).any(axis=1) & good
+        active = active[changed]
+    return masks, ok
+
+
+def solved_strings(masks, n=3):
+    """Return the grid strings of a batch of solved grids, row by row."""
+    g = geometry(n)
+    _, _, _, _, _, symbols = _tables(n)
+    index = np.log2(masks[:, g.variables]).astype(np.intp)
+    data = symbols[index].tobytes().decode()
+    return [data[i:i + g.ncells] for i in range(0, len(data), g.ncells)]
+
+
+def solve_vectorised(puzzles, n=3, batch=4096, **solve_args):
+    """Yield (puzzle, solution) for every puzzle string, solution being None
+    when there is none and BUDGET_EXCEEDED when the search ran out of
+    budget. Puzzles are propagated batch by batch; those left open are
+    solved one by one with solve(sudoku, **solve_args), starting from the
+    propagated domains."""
+    sudoku = Sudoku('', n=n)
+    for chunk in chunked(puzzles, batch):
+        masks, ok = propagate(grid_masks(chunk, n), n)
+        solved = ok & (popcount(masks) == 1).all(axis=1)
+        strings = iter(solved_strings(masks[solved], n))
+        for i, puzzle in enumerate(chunk):
+            if not ok[i]:
+                yield puzzle, None
+            elif solved[i]:
+                yield puzzle, next(strings)
+            else:
+                sudoku.load_domains(masks[i].tolist())
+                result = solve(sudoku, **solve_args)
+                yield puzzle, result_string(sudoku, result)
@@ -0,0 +1,207 @@
+"""A compact fixed-width binary format for puzzle corpora.
+
+A packed corpus is an 8-byte header followed by records of equal size:
+
+    header  b'SDKP', version 1, box size n, flags, 0
+    record  the puzzle in (ncells + 1) // 2 bytes, then the solution in as
+            many bytes if flags has HAS_SOLUTIONS set
+
+A grid is stored row by row at 4 bits a cell, the first cell of a pair in
+the high nibble: 0 for an open cell, i+1 for the i-th symbol. A 9x9 grid
+takes 41 bytes instead of an 82-byte text line, and a record is found by
+its index alone. A record without a solution has a solution of zeros.
+Only boards of up to 15 symbols fit, i.e. box sizes 2 and 3.
+
+PackedCorpus memory-maps a corpus and hands out memoryviews of its records
+without copying; Sudoku.load_packed loads one straight from such a view:
+
+    python sudoku_packed.py pack puzzles.txt puzzles.sdkp
+    python sudoku_packed.py pack --solutions solved.txt solved.sdkp
+    python sudoku_packed.py unpack puzzles.sdkp > puzzles.txt
+    python sudoku_cli.py --packed puzzles.sdkp > solutions.txt
+
+    with PackedCorpus('puzzles.sdkp') as corpus:
+        for record in corpus:
+            sudoku.load_packed(record)
+"""
+import argparse
+import mmap
+import struct
+import sys
+
+from sudoku_solver import geometry
+
+MAGIC = b'SDKP'
+VERSION = 1
+HEADER = struct.Struct('4sBBBB')
+HAS_SOLUTIONS = 1
+
+
+def pack(grid, n=3):
+    """Return the packed bytes of a grid string in the format Sudoku accepts."""
+    g = geometry(n)
+    if g.nibble_masks is None:
+        raise ValueError("Packed grids need at most 15 symbols", g.size)
+    codes = [g.index[ch] + 1 if ch in g.index else 0 for ch in g.squares(grid)]
+    codes += [0] * (2 * g.packed_size - len(codes))
+    return bytes(codes[i] << 4 | codes[i + 1] for i in range(0, len(codes), 2))
+
+
+def unpack(data, offset=0, n=3):
+    """Return the grid string, '.' for open cells, of the packed grid at
+    data[offset:]."""
+    g = geometry(n)
+    chars = '.' + g.symbols + '?' * (15 - g.size)
+    cells = []
+    for b in data[offset:offset + g.packed_size]:
+        cells.append(chars[b >> 4])
+        cells.append(chars[b & 15])
+    return ''.join(cells[:g.ncells])
+
+
+def write_packed(f, pairs, n=3, solutions=False):
+    """Write a packed corpus to the binary file f from (puzzle, solution)
+    pairs of grid strings; solution is only used if solutions is True and
+    may be None. Return the number of records written."""
+    zeros = bytes(geometry(n).packed_size)
+    f.write(HEADER.pack(MAGIC, VERSION, n, HAS_SOLUTIONS if solutions else 0, 0))
+    count = 0
+    for puzzle, solution in pairs:
+        f.write(pack(puzzle, n))
+        if solutions:
+            f.write(zeros if solution is None else pack(solution, n))
+        count += 1
+    return count
+
+
+class PackedCorpus():
+    """A packed corpus on disk, memory-mapped read-only.
+    len(corpus) is the number of records; corpus[i] is a memoryview of the
+    i-th puzzle, corpus.solution(i) of its solution, and corpus.records(i, j)
+    of records i to j-1 in one piece, for batch processing. Iterating gives
+    the puzzles in order. Views share the mapping, which is only unmapped
+    once the corpus is closed and the last view is released or dropped."""
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        try:
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ValueError("Not a packed corpus", path)  # Empty file
+        self.view = memoryview(self.mmap)
+        if len(self.view) < HEADER.size:
+            self.close()
+            raise ValueError("Not a packed corpus", path)
+        magic, version, n, flags, _ = HEADER.unpack_from(self.view)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError("Not a packed corpus", path)
+        if n not in (2, 3):
+            self.close()
+            raise ValueError("Unsupported box size in packed corpus", path, n)
+        self.n = n
+        self.has_solutions = bool(flags & HAS_SOLUTIONS)
+        self.grid_size = geometry(n).packed_size
+        self.record_size = self.grid_size * (2 if self.has_solutions else 1)
+        self.count, extra = divmod(len(self.view) - HEADER.size, self.record_size)
+        if extra:
+            self.close()
+            raise ValueError("Truncated packed corpus", path)
+
+    def __len__(self):
+        return self.count
+
+    def offset(self, i):
+        """Return the position of record i in the file."""
+        if not 0 <= i < self.count:
+            raise IndexError("record index out of range", i)
+        return HEADER.size + i * self.record_size
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.count
+        start = self.offset(i)
+        return self.view[start:start + self.grid_size]
+
+    def solution(self, i):
+        """Return a view of the solution of record i, or None if the corpus
+        has no solutions or this record has none."""
+        if not self.has_solutions:
+            return None
+        start = self.offset(i if i >= 0 else i + self.count) + self.grid_size
+        view = self.view[start:start + self.grid_size]
+        return view if any(view) else None
+
+    def records(self, start=0, stop=None):
+        """Return a view of records start to stop-1, record_size bytes each."""
+        stop = self.count if stop is None else min(stop, self.count)
+        start = HEADER.size + max(0, min(start, stop)) * self.record_size
+        return self.view[start:HEADER.size + stop * self.record_size]
+
+    def __iter__(self):
+        view, size, step = self.view, self.grid_size, self.record_size
+        for start in range(HEADER.size, HEADER.size + self.count * step, step):
+            yield view[start:start + size]
+
+    def close(self):
+        self.view.release()
+        try:
+            self.mmap.close()
+        except BufferError:
+            pass  # Views are still alive; the mapping goes with the last one
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Convert puzzles to and from the packed format.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    to_packed = commands.add_parser('pack', help='text lines to a packed corpus')
+    to_packed.add_argument('input', help="text file, one puzzle per line; '-' is stdin")
+    to_packed.add_argument('output', help='packed corpus to write')
+    to_packed.add_argument('--solutions', action='store_true',
+                           help="read 'puzzle solution' lines and store both")
+    to_packed.add_argument('-n', '--box-size', type=int, default=3)
+    to_text = commands.add_parser('unpack', help='a packed corpus to text lines')
+    to_text.add_argument('input', help='packed corpus to read')
+    to_text.add_argument('--solutions', action='store_true',
+                         help="write 'puzzle solution' lines, '-' for a missing one")
+    args = parser.parse_args(argv)
+
+    if args.command == 'pack':
+        from sudoku_cli import read_lines, read_puzzles
+
+        def pairs(lines):
+            for line in read_puzzles(lines):
+                fields = line.split()
+                solution = fields[1] if len(fields) > 1 and fields[1] not in ('-', '?') else None
+                yield fields[0], solution
+
+        with open(args.output, 'wb') as f:
+            write_packed(f, pairs(read_lines([args.input])), args.box_size, args.solutions)
+    else:
+        with PackedCorpus(args.input) as corpus:
+            out = sys.stdout
+            for i, record in enumerate(corpus):
+                puzzle = unpack(record, n=corpus.n)
+                record.release()
+                if args.solutions:
+                    solution = corpus.solution(i)
+                    if solution is None:
+                        out.write(puzzle + ' -\n')
+                    else:
+                        out.write('%s %s\n' % (puzzle, unpack(solution, n=corpus.n)))
+                        solution.release()
+                else:
+                    out.write(puzzle + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,1030 @@
+"""Sudoku as a constraint satisfaction problem, solved by backtracking search.
+
+This module has no GUI dependencies; SudokuSolver_finalProject.py builds the
+Tk front end on top of it and sudoku_cli.py solves puzzles in bulk.
+"""
+import itertools      
+import operator
+import re
+import random
+import functools
+import time
+from functools import reduce
+ 
+
+#%% Utilities
+def first(iterable, default=None):
+    """Return the first element of an iterable; or default."""
+    return next(iter(iterable), default)
+
+def count(seq):
+    """Count the number of items in sequence that are interpreted as true."""
+    return sum(map(bool, seq))
+
+def argmin_random_tie(seq, key=lambda x: x):
+    """Return a minimum element of seq; break ties at random."""
+    items = list(seq)
+    random.shuffle(items) #Randomly shuffle a copy of seq.
+    return min(items, key=key)
+
+def flatten(seqs):
+    return sum(seqs, [])
+
+def different_values_constraint(A, a, B, b):
+    """A constraint saying two neighboring variables must differ in value."""
+    return a != b
+
+
+#%% CSP
+class CSP():
+    """This class describes finite-domain Constraint Satisfaction Problems.
+    A CSP is specified by the following inputs:
+        variables   A list of variables; each is atomic (e.g. int or string).
+        domains     A dict of {var:[possible_value, ...]} entries.
+        neighbors   A dict of {var:[var,...]} that for each variable lists
+                    the other variables that participate in constraints.
+        constraints A function f(A, a, B, b) that returns true if neighbors
+                    A, B satisfy the constraint when they have values A=a, B=b
+    """
+    def __init__(self, variables, domains, neighbors, constraints):
+        """Construct a CSP problem. If variables is empty, it becomes domains.keys()."""
+        variables = variables or list(domains.keys())
+        self.variables = variables
+        self.domains = domains
+        self.neighbors = neighbors
+        self.constraints = constraints
+        self.curr_domains = None
+        self.nassigns = 0
+        # Undo stack of the removals made during a search
+        self.trail = []
+
+    # Subclasses that keep domains as bitmasks set this to True
+    bitset = False
+
+    def assign(self, var, val, assignment):
+        """Add {var: val} to assignment; Discard the old value if any."""
+        assignment[var] = val
+        self.nassigns += 1
+        return assignment
+
+    def unassign(self, var, assignment):
+        """Remove {var: val} from assignment.
+        DO NOT call this if you are changing a variable to a new value;
+        just call assign for that."""
+        if var in assignment:
+            del assignment[var]
+
+    def nconflicts(self, var, val, assignment):
+        """Return the number of conflicts var=val has with other variables."""  
+        # Subclasses may implement this more efficiently
+        def conflict(var2):
+            return var2 in assignment and not self.constraints(var, val, var2, assignment[var2])
+
+        return count(conflict(v) for v in self.neighbors[var])
+
+    def support_pruning(self):
+        """Set up curr_domains and an empty trail at the start of a search."""
+        self.curr_domains = {v: list(self.domains[v]) for v in self.variables}
+        del self.trail[:]
+
+    def suppose(self, var, value, removals):
+        """Reduce the domain of var to [value], recording the removals."""
+        removals.extend((var, a) for a in self.curr_domains[var] if a != value)
+        self.curr_domains[var] = [value]
+
+    def prune(self, var, value, removals):
+        """Rule out var=value."""
+        self.curr_domains[var].remove(value)
+        if removals is not None:
+            removals.append((var, value))
+
+
+#%% Sudoku problem
+# Constants and delarations to display and work with Sudoku grid
+_R3 = list(range(3))
+_CELL = itertools.count().__next__
+_BGRID = [[[[_CELL() for x in _R3] for y in _R3] for bx in _R3] for by in _R3]
+_BOXES = flatten([list(map(flatten, brow)) for brow in _BGRID])
+_ROWS = flatten([list(map(flatten, zip(*brow))) for brow in _BGRID])
+_COLS = list(zip(*_ROWS))
+_NEIGHBORS = {v: set() for v in flatten(_ROWS)}
+for unit in map(set, _BOXES + _ROWS + _COLS):
+    for v in unit:
+        _NEIGHBORS[v].update(unit - {v})
+
+# Cell symbols, in order: an N x N grid uses the first N of them
+SYMBOLS = '123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+# The searches recurse once per variable; 25x25 boards take 625 levels,
+# 36x36 ones would pass Python's default recursion limit of 1000
+MAX_BOX_SIZE = 5
+
+
+class Geometry():
+    """The tables of a Sudoku with n x n boxes, i.e. an N x N grid with
+    N = n*n symbols per unit; cells are numbered box by box as in _BGRID.
+    Use geometry(n), which builds them once per box size.
+    In the bitset engine a domain is an N-bit int, where bit i is set when
+    the i-th symbol is possible."""
+    def __init__(self, n):
+        size = n * n
+        if not 2 <= n <= MAX_BOX_SIZE:
+            raise ValueError("Unsupported box size", n)
+        self.n = n
+        self.size = size
+        self.ncells = size * size
+        self.symbols = SYMBOLS[:size]
+        self.all = (1 << size) - 1
+        self.bit = {d: 1 << i for i, d in enumerate(self.symbols)}
+        self.index = {d: i for i, d in enumerate(self.symbols)}
+        # '.' and '0' are open cells, anything else is ignored by the parser;
+        # letters may be given in either case if the symbols have only one
+        self.pattern = re.compile('[.0%s]' % re.escape(self.symbols))
+        self.casefold = self.symbols.upper() != self.symbols.lower() and \
+            self.symbols.upper() == self.symbols
+
+        R = list(range(n))
+        cell = itertools.count().__next__
+        self.bgrid = [[[[cell() for x in R] for y in R] for bx in R] for by in R]
+        self.boxes = flatten([list(map(flatten, brow)) for brow in self.bgrid])
+        self.rows = flatten([list(map(flatten, zip(*brow))) for brow in self.bgrid])
+        self.cols = list(zip(*self.rows))
+        self.units = [tuple(unit) for unit in self.boxes + self.rows + self.cols]
+        self.neighbors = {v: set() for v in flatten(self.rows)}
+        for unit in map(set, self.units):
+            for v in unit:
+                self.neighbors[v].update(unit - {v})
+        self.variables = tuple(flatten(self.rows))  # row by row
+        self.peers = [tuple(sorted(self.neighbors[v])) for v in range(self.ncells)]
+        self.peer_mask = [sum(1 << p for p in self.peers[v]) for v in range(self.ncells)]
+        # unit_mask[v] has bit i set when v is in units[i]
+        self.unit_mask = [sum(1 << i for i, unit in enumerate(self.units) if v in unit)
+                          for v in range(self.ncells)]
+        self.zeros = (0,) * size
+        self._values = {}
+        # Packed grids (see sudoku_packed) store a cell in 4 bits, 0 for an
+        # open cell and i+1 for the i-th symbol, row by row, two to a byte
+        self.packed_size = (self.ncells + 1) // 2
+        self.position = [self.variables.index(v) for v in range(self.ncells)]
+        if size < 16:
+            nibble = [self.all] + [1 << i for i in range(size)]
+            nibble += [0] * (16 - len(nibble))  # no candidates: unsolvable
+            self.nibble_masks = [(nibble[b >> 4], nibble[b & 15]) for b in range(256)]
+        else:
+            self.nibble_masks = None
+
+    def squares(self, grid):
+        """Return the ncells squares of a grid string, '.' or '0' for an open
+        cell; a grid without any squares is an empty board."""
+        if self.casefold:
+            grid = grid.upper()
+        squares = self.pattern.findall(grid)
+        if not squares:
+            return '.' * self.ncells
+        if len(squares) != self.ncells:
+            raise ValueError("Not a Sudoku grid", grid)  # Too few or too many squares
+        return squares
+
+    def values(self, mask):
+        """Return the symbols whose bits are set in mask."""
+        values = self._values.get(mask)
+        if values is None:
+            values = tuple(d for d in self.symbols if mask & self.bit[d])
+            if len(self._values) >= 1 << 16:
+                self._values.clear()
+            self._values[mask] = values
+        return values
+
+
+@functools.lru_cache(maxsize=None)
+def geometry(n):
+    """Return the Geometry of a Sudoku with n x n boxes."""
+    return Geometry(n)
+
+
+class Sudoku(CSP):
+    """
+    A Sudoku problem.
+    init_assignment is a string of 81 digits for 81 cells, row by row.  
+    Each filled cell holds a digit in 1..9. Each empty cell holds 0 or '.' 
+    
+    For example, for the below Sodoku
+    init_assignment = '..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3..'
+
+    Larger boards take the box size n: Sudoku(grid, n=4) is a 16x16 grid of
+    256 cells using the symbols 1-9 and A-G, n=5 a 25x25 grid using 1-9 and
+    A-P, in either case. Other characters are skipped; a grid must give all
+    its cells, or none for an empty board, else ValueError is raised. The
+    class attributes below describe the 9x9 board; an instance has the
+    tables of its own size."""
+    R3 = _R3
+    Cell = _CELL
+    bgrid = _BGRID
+    boxes = _BOXES
+    rows = _ROWS
+    cols = _COLS
+    neighbors = _NEIGHBORS    
+    peers = geometry(3).peers
+   
+    def __init__(self, grid, bitset=True, n=3):
+        """Build a Sudoku problem from a string representing the grid:
+        the digits 1-9 denote a filled cell, '.' or '0' an empty one;
+        other characters are ignored.
+        With bitset=True (the default) every domain is a 9-bit mask in a list
+        indexed by variable; bitset=False keeps the original lists of digits.
+        n is the box size; see geometry()."""
+        g = self.geometry = geometry(n)
+        self.bgrid, self.boxes, self.rows, self.cols = g.bgrid, g.boxes, g.rows, g.cols
+        self.units, self.peers, self.peer_mask = g.units, g.peers, g.peer_mask
+        self.bit, self.index = g.bit, g.index
+        self.bitset = bitset
+        # placed[i] has bit v set when variable v is assigned the i-th symbol
+        self.placed = list(g.zeros)
+        # buckets[k] holds the unassigned variables with k values left;
+        # built by incremental_mrv and kept up to date while it is in use
+        self.buckets = None
+        # Preallocated storage that support_pruning copies the domains into
+        self._curr = [0] * g.ncells if bitset else None
+        CSP.__init__(self, list(g.variables), [g.all] * g.ncells if bitset else {},
+                     g.neighbors, different_values_constraint)
+        self.load(grid)
+
+    def load(self, grid):
+        """Replace the puzzle with grid, in the same format as for the
+        constructor, reusing the tables of this object."""
+        g = self.geometry
+        squares = g.squares(grid)
+
+        if self.bitset:
+            domains = self.domains
+            for var, ch in zip(g.variables, squares):
+                domains[var] = g.bit.get(ch, g.all)
+        else:
+            # NOTE: For variables in order of in order of 3x3 BOXES:
+            self.domains = {var: list(ch) if ch in g.bit else list(g.symbols)
+                            for var, ch in zip(g.variables, squares)}
+        self.curr_domains = None
+        self.nassigns = 0
+
+    def load_domains(self, masks):
+        """Replace the puzzle by candidate bitmasks, one per variable and
+        indexed by it, as the bitset engine stores them."""
+        g = self.geometry
+        if len(masks) != g.ncells:
+            raise ValueError("Not a Sudoku grid", masks)
+        if self.bitset:
+            self.domains[:] = masks
+        else:
+            self.domains = {var: list(g.values(masks[var])) for var in g.variables}
+        self.curr_domains = None
+        self.nassigns = 0
+
+    def load_packed(self, data, offset=0):
+        """Replace the puzzle by the packed grid at data[offset:], where data
+        is any bytes-like object, e.g. a memoryview of a memory-mapped
+        corpus; see sudoku_packed. No string is built on the way."""
+        g = self.geometry
+        if g.nibble_masks is None:
+            raise ValueError("Packed grids need at most 15 symbols", g.size)
+        end = offset + g.packed_size
+        if len(data) < end:
+            raise ValueError("Not a packed grid", bytes(data[offset:end]))
+        nibble_masks = g.nibble_masks
+        masks = [m for b in data[offset:end] for m in nibble_masks[b]]
+        self.load_domains([masks[i] for i in g.position])
+
+    def assign(self, var, val, assignment):
+        if self.bitset:
+            if var in assignment:
+                self.placed[self.index[assignment[var]]] &= ~(1 << var)
+            elif self.buckets is not None:
+                self.buckets[self.curr_domains[var].bit_count()].discard(var)
+            self.placed[self.index[val]] |= 1 << var
+        return CSP.assign(self, var, val, assignment)
+
+    def unassign(self, var, assignment):
+        if self.bitset and var in assignment:
+            self.placed[self.index[assignment[var]]] &= ~(1 << var)
+            if self.buckets is not None:
+                self.buckets[self.curr_domains[var].bit_count()].add(var)
+        CSP.unassign(self, var, assignment)
+
+    def rebucket(self, var, old, new):
+        """Move var to the bucket for its new domain if it is in the buckets."""
+        bucket = self.buckets[old.bit_count()]
+        if var in bucket:
+            bucket.remove(var)
+            self.buckets[new.bit_count()].add(var)
+
+    def nconflicts(self, var, val, assignment):
+        """Return the number of conflicts var=val has with other variables.
+        In bitset mode this only sees assignments made through assign()."""
+        if self.bitset:
+            return (self.placed[self.index[val]] & self.peer_mask[var]).bit_count()
+        return CSP.nconflicts(self, var, val, assignment)
+
+    def support_pruning(self):
+        if not self.bitset:
+            return CSP.support_pruning(self)
+        self.placed[:] = self.geometry.zeros
+        self.buckets = None
+        self._curr[:] = self.domains
+        self.curr_domains = self._curr
+        del self.trail[:]
+
+    def suppose(self, var, value, removals):
+        if self.bitset:
+            bit = self.bit[value]
+            removals.append((var, self.curr_domains[var] & ~bit))
+            self.curr_domains[var] = bit
+        else:
+            CSP.suppose(self, var, value, removals)
+
+    def propagate(self, queue, removals, hidden=False, pairs=False):
+        """Prune the current domains to a fixpoint; return False on a wipe-out.
+        queue holds variables whose domain has just shrunk to a single value;
+        that value is removed from their peers, which is arc consistency for
+        the all-different constraints. With hidden=True a digit that has one
+        place left in a unit is put there (hidden single); with pairs=True two
+        cells of a unit left with the same two digits remove them from the
+        rest of the unit (naked pair)."""
+        if not self.bitset:
+            return self._propagate_lists(queue, removals, hidden, pairs)
+        curr = self.curr_domains
+        buckets = self.buckets
+        peers, units, full = self.peers, self.units, self.geometry.all
+        unit_mask = self.geometry.unit_mask
+        queue = list(queue)
+        # Bit i is set in these while unit i has changed since its last scan
+        hidden_todo = pairs_todo = 0
+        for X in queue:
+            hidden_todo |= unit_mask[X]
+        pairs_todo = hidden_todo
+        while True:
+            # Naked singles
+            while queue:
+                X = queue.pop()
+                bit = curr[X]
+                for B in peers[X]:
+                    m = curr[B]
+                    if m & bit:
+                        if m == bit:
+                            return False
+                        m ^= bit
+                        curr[B] = m
+                        hidden_todo |= unit_mask[B]
+                        if buckets is not None:
+                            self.rebucket(B, m | bit, m)
+                        if removals is not None:
+                            removals.append((B, bit))
+                        if not m & (m - 1):
+                            queue.append(B)
+            # Hidden singles
+            if hidden:
+                todo, hidden_todo = hidden_todo, 0
+                pairs_todo |= todo
+                while todo:
+                    low = todo & -todo
+                    todo ^= low
+                    unit = units[low.bit_length() - 1]
+                    once = twice = 0
+                    for v in unit:
+                        m = curr[v]
+                        twice |= once & m
+                        once |= m
+                    if once != full:
+                        return False
+                    only = once & ~twice
+                    if only:
+                        for v in unit:
+                            m = curr[v]
+                            h = m & only
+                            if h and h != m:
+                                if h & (h - 1):
+                                    return False
+                                curr[v] = h
+                                hidden_todo |= unit_mask[v]
+                                if buckets is not None:
+                                    self.rebucket(v, m, h)
+                                if removals is not None:
+                                    removals.append((v, m ^ h))
+                                queue.append(v)
+                if queue:
+                    continue
+            # Naked pairs
+            if pairs:
+                todo, pairs_todo = pairs_todo | hidden_todo, 0
+                while todo:
+                    low = todo & -todo
+                    todo ^= low
+                    unit = units[low.bit_length() - 1]
+                    seen = set()
+                    for v in unit:
+                        m = curr[v]
+                        if m.bit_count() != 2:
+                            continue
+                        if m not in seen:
+                            seen.add(m)
+                            continue
+                        for B in unit:
+                            b = curr[B]
+                            if b & m and b != m:
+                                if not b & ~m:
+                                    return False
+                                curr[B] = b & ~m
+                                hidden_todo |= unit_mask[B]
+                                if buckets is not None:
+                                    self.rebucket(B, b, b & ~m)
+                                if removals is not None:
+                                    removals.append((B, b & m))
+                                if not curr[B] & (curr[B] - 1):
+                                    queue.append(B)
+            if not queue and not (hidden and hidden_todo):
+                return True
+            pairs_todo |= hidden_todo
+
+    def _propagate_lists(self, queue, removals, hidden, pairs):
+        """propagate() for list domains."""
+        curr = self.curr_domains
+        queue = list(queue)
+        while True:
+            while queue:
+                X = queue.pop()
+                x = curr[X][0]
+                for B in self.neighbors[X]:
+                    if x in curr[B]:
+                        if len(curr[B]) == 1:
+                            return False
+                        self.prune(B, x, removals)
+                        if len(curr[B]) == 1:
+                            queue.append(B)
+            if hidden:
+                for unit in self.units:
+                    for d in self.geometry.symbols:
+                        places = [v for v in unit if d in curr[v]]
+                        if not places:
+                            return False
+                        if len(places) == 1 and len(curr[places[0]]) > 1:
+                            for a in curr[places[0]][:]:
+                                if a != d:
+                                    self.prune(places[0], a, removals)
+                            queue.append(places[0])
+                if queue:
+                    continue
+            changed = False
+            if pairs:
+                for unit in self.units:
+                    seen = []
+                    for v in unit:
+                        if len(curr[v]) != 2:
+                            continue
+                        pair = set(curr[v])
+                        if pair not in seen:
+                            seen.append(pair)
+                            continue
+                        for B in unit:
+                            if len(curr[B]) > 1 and set(curr[B]) != pair:
+                                for a in pair:
+                                    if a in curr[B]:
+                                        self.prune(B, a, removals)
+                                        changed = True
+                                if len(curr[B]) == 1:
+                                    queue.append(B)
+            if not (queue or changed):
+                return True
+
+    def choices(self, var):
+        """Return the symbols still possible for var."""
+        domain = (self.curr_domains or self.domains)[var]
+        return self.geometry.values(domain) if self.bitset else domain
+
+    def grid_string(self, assignment=None):
+        """Return the grid as one character per cell, row by row, '.' for open
+        cells. Cells are taken from assignment if given, else from the domains."""
+        chars = []
+        for var in self.variables:
+            if assignment is not None:
+                chars.append(assignment.get(var, '.'))
+            else:
+                values = self.choices(var)
+                chars.append(values[0] if len(values) == 1 else '.')
+        return ''.join(chars)
+
+    def display(self): # For variables in order of in order of 3x3 BOXES
+        """Show a human-readable representation of the Sudoku."""
+        place = 0
+        n, N = self.geometry.n, self.geometry.size
+        if self.curr_domains is not None:
+            self.domains = self.curr_domains.copy() 
+        for var in self.variables:
+            if place%n == 0 and place%N != 0 :
+                print('  |', end = '')
+            if place%N == 0 and place!=0:
+                print('')
+            if place%(n*N) == 0 and place!=0:
+                print(' ' + '-' * (3*N + 3*(n-1) - 1))
+
+            values = self.choices(var)
+            if len(values)==1:
+                print('%3s' % values[0], end = '')
+            else:
+                print('  .', end = '')  
+            place += 1
+        print('\n')    
+         
+    def display_variables(self): # For variables in order of in order of 3x3 BOXES
+        place = 0
+        n, N = self.geometry.n, self.geometry.size
+        for var in self.variables:
+            if place%n == 0 and place%N != 0 :
+                print('  |', end = '')
+            if place%N == 0 and place!=0:
+                print('')
+            if place%(n*N) == 0 and place!=0:
+                print(' ' + '-' * (3*N + 3*(n-1) - 1))
+
+            print('%3s' % var, end = '')
+            
+            place += 1
+        print('\n')     
+#%%  CSP Backtracking Search  
+# Variable ordering
+def first_unassigned_variable(assignment, csp): #random selection
+    """The default variable order."""
+    return first([var for var in csp.variables if var not in assignment])
+
+def num_legal_values(csp, var, assignment):
+    if csp.bitset and csp.curr_domains:
+        return csp.curr_domains[var].bit_count()
+    if csp.curr_domains:
+        return len(csp.curr_domains[var])
+    else:
+        return count(csp.nconflicts(var, val, assignment) == 0 for val in csp.choices(var))
+
+def _domain_buckets(assignment, csp):
+    """Return csp.buckets, building them from the current domains first if
+    they are not in use yet."""
+    buckets = csp.buckets
+    if buckets is None:
+        curr = csp.curr_domains
+        buckets = csp.buckets = [set() for _ in range(csp.geometry.size + 1)]
+        for v in csp.variables:
+            if v not in assignment:
+                buckets[curr[v].bit_count()].add(v)
+    return buckets
+
+def minimum_remaining_values(assignment, csp):
+    """Minimum-remaining-values heuristic; ties are broken at random. In
+    bitset mode the ties are the first non-empty bucket of incremental_mrv,
+    so no rescan of the domains is needed."""
+    if csp.bitset and csp.curr_domains:
+        for bucket in _domain_buckets(assignment, csp):
+            if bucket:
+                return random.choice(tuple(bucket))
+    return argmin_random_tie([v for v in csp.variables if v not in assignment],
+                             key=lambda var: num_legal_values(csp, var, assignment))
+
+def incremental_mrv(assignment, csp):
+    """Minimum-remaining-values heuristic without a rescan: unassigned
+    variables sit in buckets by domain size, which assign, unassign, the
+    inference functions and restore keep up to date, so the next variable
+    is read off the first non-empty bucket. Ties are broken the same way
+    on every run."""
+    if not csp.bitset:
+        return minimum_remaining_values(assignment, csp)
+    for bucket in _domain_buckets(assignment, csp):
+        if bucket:
+            return next(iter(bucket))
+
+# Value ordering
+def unordered_domain_values(var, assignment, csp): #random selection
+    """The default value order."""
+    if csp.bitset:
+        return csp.choices(var)
+    return (csp.curr_domains or csp.domains)[var]
+
+def least_constraining_value(var, assignment, csp):
+    """Least-constraining-values heuristic."""
+    return sorted(unordered_domain_values(var, assignment, csp), key=lambda val: csp.nconflicts(var, val, assignment))   
+
+def least_eliminating_value(var, assignment, csp):
+    """Least-constraining-values heuristic on the current domains: try first
+    the values that fewest unassigned neighbors still have as a candidate."""
+    values = unordered_domain_values(var, assignment, csp)
+    if len(values) < 2:
+        return values
+    curr = csp.curr_domains or csp.domains
+    if csp.bitset:
+        counts = list(csp.geometry.zeros)
+        for B in csp.peers[var]:
+            if B not in assignment:
+                m = curr[B]
+                while m:
+                    low = m & -m
+                    counts[low.bit_length() - 1] += 1
+                    m ^= low
+        index = csp.index
+        return sorted(values, key=lambda val: counts[index[val]])
+    return sorted(values, key=lambda val: count(B not in assignment and val in curr[B]
+                                                for B in csp.neighbors[var]))
+
+# Inference
+def no_inference(csp, var, value, assignment, removals):
+    return True
+
+def forward_checking(csp, var, value, assignment, removals):
+    """Prune neighbor values inconsistent with var=value."""
+    if csp.bitset:
+        bit = csp.bit[value]
+        curr = csp.curr_domains
+        buckets = csp.buckets
+        for B in csp.peers[var]:
+            if curr[B] & bit and B not in assignment:
+                curr[B] ^= bit
+                if buckets is not None:
+                    n = curr[B].bit_count()
+                    buckets[n + 1].remove(B)
+                    buckets[n].add(B)
+                if removals is not None:
+                    removals.append((B, bit))
+                if not curr[B]:
+                    return False
+        return True
+    for B in csp.neighbors[var]:
+        if B not in assignment:
+            for b in csp.curr_domains[B][:]:
+                if not csp.constraints(var, value, B, b):
+                    csp.curr_domains[B].remove(b)
+                    if removals is not None:
+                        removals.append((B, b)) # variable B and value b are removed from its domain
+            if not csp.curr_domains[B]:
+                return False
+    return True
+
+def AC3(csp, queue=None, removals=None):
+    """[Figure 6.3]"""
+    if queue is None:
+        queue = {(Xi, Xk) for Xi in csp.variables for Xk in csp.neighbors[Xi]}
+    while queue:
+        (Xi, Xj) = queue.pop()
+        if revise(csp, Xi, Xj, removals):
+            if not csp.curr_domains[Xi]:
+                return False
+            for Xk in csp.neighbors[Xi]:
+                if Xk != Xj:
+                    queue.add((Xk, Xi))
+    return True
+
+def revise(csp, Xi, Xj, removals):
+    """Return true if we remove a value."""
+    revised = False
+    for x in csp.curr_domains[Xi][:]:
+        # If Xi=x conflicts with Xj=y for every possible y, eliminate Xi=x
+        if all(not csp.constraints(Xi, x, Xj, y) for y in csp.curr_domains[Xj]):
+            csp.prune(Xi, x, removals)
+            revised = True
+    return revised
+
+def mac(csp, var, value, assignment, removals):
+    """Maintain arc consistency."""
+    if isinstance(csp, Sudoku):
+        # With all-different constraints an arc only prunes a single value
+        return csp.propagate([var], removals)
+    return AC3(csp, {(X, var) for X in csp.neighbors[var]}, removals)
+
+def hidden_singles(csp, var, value, assignment, removals):
+    """Maintain arc consistency and place every hidden single, to a fixpoint."""
+    return csp.propagate([var], removals, hidden=True)
+
+def naked_pairs(csp, var, value, assignment, removals):
+    """Like hidden_singles, and also eliminate naked pairs."""
+    return csp.propagate([var], removals, hidden=True, pairs=True)
+
+
+_second = operator.itemgetter(1)
+
+class SearchStats():
+    """Counters of one search, left on csp.stats by backtracking_search:
+        nodes           calls of backtrack, i.e. search nodes expanded
+        backtracks      assignments taken back after failing
+        max_depth       most variables assigned at once
+        time            seconds spent in the search
+        restarts        searches started over by restarting_search
+    and, only when the search is run with profile=True:
+        pruned          values removed from domains by inference
+        propagate_time  seconds of time spent in inference; the rest,
+                        branch_time, went on choosing variables and
+                        values, checking conflicts and undoing
+    """
+    def __init__(self, profile=False):
+        self.nodes = 0
+        self.backtracks = 0
+        self.max_depth = 0
+        self.time = 0.0
+        self.restarts = 0
+        self.pruned = 0 if profile else None
+        self.propagate_time = 0.0 if profile else None
+
+    @property
+    def branch_time(self):
+        if self.propagate_time is None:
+            return None
+        return self.time - self.propagate_time
+
+    def as_dict(self):
+        return dict(vars(self), branch_time=self.branch_time)
+
+    def __repr__(self):
+        return 'SearchStats(%s)' % ', '.join('%s=%r' % kv for kv in self.as_dict().items())
+
+
+def percentile(sorted_values, p):
+    """Return the p-th percentile of sorted_values by the nearest-rank method,
+    or None if there are none."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def profiled(inference, stats, on_prune=None):
+    """Wrap an inference function so that it adds the values it prunes and
+    the time it takes to stats, and reports its removals to on_prune.
+    Counters that stats leaves as None, without profiling, stay None."""
+    clock = time.perf_counter
+
+    def inference_profiled(csp, var, value, assignment, removals):
+        mark = len(removals)
+        if stats.propagate_time is None:
+            # Only the on_prune hook is wanted; there is nothing to time
+            consistent = inference(csp, var, value, assignment, removals)
+        else:
+            start = clock()
+            consistent = inference(csp, var, value, assignment, removals)
+            stats.propagate_time += clock() - start
+        if stats.pruned is not None:
+            if csp.bitset:
+                stats.pruned += sum(map(int.bit_count, map(_second, removals[mark:])))
+            else:
+                stats.pruned += len(removals) - mark
+        if consistent and on_prune is not None:
+            on_prune(var, value, removals[mark:])
+        return consistent
+    return inference_profiled
+
+
+class _BudgetExceeded():
+    """The type of BUDGET_EXCEEDED."""
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return 'BUDGET_EXCEEDED'
+
+    def __reduce__(self):
+        return 'BUDGET_EXCEEDED'
+
+# What a search returns when it runs out of nodes or time before it finds a
+# solution or proves there is none; unlike None it says nothing of the puzzle
+BUDGET_EXCEEDED = _BudgetExceeded()
+
+class _OutOfBudget(Exception):
+    """Unwinds a search that has used up its budget."""
+
+
+# Backtracking search
+def backtracking_search(csp, select_unassigned_variable=minimum_remaining_values,
+                        order_domain_values=least_constraining_value, 
+                        inference=forward_checking, profile=False,
+                        on_assign=None, on_prune=None, on_backtrack=None,
+                        max_nodes=None, timeout=None):
+    """See [Figure 6.5] for the algorithm. Counters of the search are left
+    in csp.stats, a SearchStats; profile=True also times inference and
+    counts the values it prunes, at some cost per node. The optional hooks
+    are called as
+        on_assign(var, value, assignment)      after var=value is made
+        on_prune(var, value, removals)         after inference from var=value
+                                               succeeded, with the entries
+                                               it pushed onto the trail
+        on_backtrack(var, value, assignment)   when var=value is taken back
+    and cost nothing when left as None.
+    The search gives up and returns BUDGET_EXCEEDED after expanding
+    max_nodes nodes or once timeout seconds have passed; the clock is read
+    every 64 nodes, so it may run a few nodes past its deadline."""
+    stats = csp.stats = SearchStats(profile)
+    if profile or on_prune is not None:
+        inference = profiled(inference, stats, on_prune)
+    limited = max_nodes is not None or timeout is not None
+    clock = time.perf_counter
+
+    def backtrack(assignment):            
+        if limited:
+            if max_nodes is not None and stats.nodes >= max_nodes:
+                raise _OutOfBudget
+            if deadline is not None and not stats.nodes & 63 and clock() > deadline:
+                raise _OutOfBudget
+        stats.nodes += 1
+        if len(assignment) > stats.max_depth:
+            stats.max_depth = len(assignment)
+        if len(assignment) == len(csp.variables):
+            return assignment
+        # choose variable with the fewest "legal" value
+        var = select_unassigned_variable(assignment, csp)
+
+        # choose the value that have the least affect on other variable's domain
+        for value in order_domain_values(var, assignment, csp):
+
+            # check if selected value is satisfies the contraint
+            if 0 == csp.nconflicts(var, value, assignment):
+
+                # add variable and its value to assignment
+                csp.assign(var, value, assignment)
+                if on_assign is not None:
+                    on_assign(var, value, assignment)
+                
+                # every value removed from now on is pushed onto the trail
+                mark = len(trail)
+                csp.suppose(var, value, trail)
+
+                # check if assigned value is consistent and remove it from other variable's domain
+                if inference(csp, var, value, assignment, trail):
+
+                    # if true continue
+                    result = backtrack(assignment)
+
+                    # find result
+                    if result is not None:
+                        return result        
+                # restore other variable's domain
+                restore(csp, trail, mark)
+                stats.backtracks += 1
+                if on_backtrack is not None:
+                    on_backtrack(var, value, assignment)
+        
+        # remove variable from assignment
+        csp.unassign(var, assignment) 
+        #print("Running")
+        return None
+
+    begin = clock()
+    deadline = None if timeout is None else begin + timeout
+    csp.support_pruning()
+    trail = csp.trail
+
+    # Start
+    try:
+        result = backtrack({})       
+    except _OutOfBudget:
+        # The domains are left half-searched; the next search resets them
+        result = BUDGET_EXCEEDED
+    stats.time = clock() - begin
+    
+    return result
+
+def luby(i):
+    """Return the i-th term, from i=1, of the Luby sequence
+    1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8, ..."""
+    k = i.bit_length()
+    while True:
+        if i == (1 << k) - 1:
+            return 1 << (k - 1)
+        if i < (1 << k) - 1:
+            i -= (1 << (k - 1)) - 1
+            k = i.bit_length()
+        else:
+            k += 1
+
+def restarting_search(csp, restart_unit=100, max_nodes=None, timeout=None,
+                      select_unassigned_variable=minimum_remaining_values,
+                      **search_args):
+    """Run backtracking_search over and over, the i-th time with a budget
+    of restart_unit * luby(i) nodes, until one run finishes. A run that
+    draws an unlucky early choice is cut short instead of exploring a huge
+    subtree, which trims the long tail of search times at the cost of
+    repeating work on the puzzles that needed no luck. This only helps if
+    the runs differ, so select_unassigned_variable must break ties at
+    random as minimum_remaining_values does; the deterministic
+    incremental_mrv and first_unassigned_variable raise ValueError.
+    max_nodes and timeout bound all runs together; when they run out
+    BUDGET_EXCEEDED is returned. csp.stats adds up the runs, with restarts
+    counting all but the first."""
+    if select_unassigned_variable in (incremental_mrv, first_unassigned_variable):
+        raise ValueError("Restarts would repeat the same run",
+                         select_unassigned_variable.__name__)
+    total = SearchStats(search_args.get('profile', False))
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    result = BUDGET_EXCEEDED
+    for i in itertools.count(1):
+        budget = restart_unit * luby(i)
+        if max_nodes is not None:
+            budget = min(budget, max_nodes - total.nodes)
+        remaining = None if deadline is None else deadline - time.perf_counter()
+        if budget <= 0 or (remaining is not None and remaining <= 0):
+            break
+        result = backtracking_search(csp, select_unassigned_variable,
+                                     max_nodes=budget, timeout=remaining, **search_args)
+        stats = csp.stats
+        total.nodes += stats.nodes
+        total.backtracks += stats.backtracks
+        total.max_depth = max(total.max_depth, stats.max_depth)
+        total.time += stats.time
+        if total.pruned is not None:
+            total.pruned += stats.pruned
+            total.propagate_time += stats.propagate_time
+        if result is not BUDGET_EXCEEDED:
+            break
+        total.restarts += 1
+    csp.stats = total
+    return result
+
+def count_solutions(csp, limit=2, select_unassigned_variable=incremental_mrv,
+                    order_domain_values=unordered_domain_values,
+                    inference=hidden_singles, on_assign=None):
+    """Return the number of solutions of csp, but stop counting at limit:
+    count_solutions(csp) is 0, 1 or 2, which tells whether the solution is
+    unique. The search is backtracking_search that carries on past each
+    solution; it reuses the domains and trail of csp like any search, leaves
+    its nodes, backtracks, depth and time in csp.stats, and calls on_assign
+    the same way, so raising from the hook abandons the count."""
+    def backtrack(assignment, wanted):
+        # Count up to wanted solutions below assignment
+        stats.nodes += 1
+        if len(assignment) > stats.max_depth:
+            stats.max_depth = len(assignment)
+        if len(assignment) == len(csp.variables):
+            return 1
+        var = select_unassigned_variable(assignment, csp)
+        found = 0
+        for value in order_domain_values(var, assignment, csp):
+            if 0 == csp.nconflicts(var, value, assignment):
+                csp.assign(var, value, assignment)
+                if on_assign is not None:
+                    on_assign(var, value, assignment)
+                mark = len(trail)
+                csp.suppose(var, value, trail)
+                if inference(csp, var, value, assignment, trail):
+                    found += backtrack(assignment, wanted - found)
+                restore(csp, trail, mark)
+                if found >= wanted:
+                    break
+                stats.backtracks += 1
+        csp.unassign(var, assignment)
+        return found
+
+    stats = csp.stats = SearchStats()
+    csp.support_pruning()
+    trail = csp.trail
+    start = time.perf_counter()
+    try:
+        return backtrack({}, limit) if limit > 0 else 0
+    finally:
+        stats.time = time.perf_counter() - start
+
+def has_unique_solution(csp):
+    """Return True if csp has exactly one solution."""
+    return count_solutions(csp, limit=2) == 1
+
+def solve(csp, backend='csp', **search_args):
+    """Solve a Sudoku; return the assignment {var: value}, or None if there
+    is no solution. backend 'csp' runs backtracking_search, passing on
+    search_args, or restarting_search if they include a restart_unit;
+    'dlx' runs the exact-cover solver of sudoku_dlx, which has no budget."""
+    if backend == 'csp':
+        restart_unit = search_args.pop('restart_unit', None)
+        if restart_unit:
+            return restarting_search(csp, restart_unit, **search_args)
+        return backtracking_search(csp, **search_args)
+    if backend == 'dlx':
+        from sudoku_dlx import dlx_search
+        return dlx_search(csp)
+    raise ValueError("Unknown backend", backend)
+
+def result_string(csp, result):
+    """Return the grid string of the assignment a search returned, or
+    result itself if that is None or BUDGET_EXCEEDED."""
+    if result is None or result is BUDGET_EXCEEDED:
+        return result
+    return csp.grid_string(result)
+
+def restore(csp, removals, mark=0):
+    """Undo a supposition and all inferences from it: put back the removals
+    recorded from position mark on and truncate the list there. Only the
+    entries undone are visited, however long the trail below mark is."""
+    if csp.bitset:
+        curr = csp.curr_domains
+        buckets = csp.buckets
+        if buckets is not None:
+            # csp.rebucket inlined; assigned variables are in no bucket
+            for B, b in removals[mark:]:
+                old = curr[B]
+                new = curr[B] = old | b
+                bucket = buckets[old.bit_count()]
+                if B in bucket:
+                    bucket.remove(B)
+                    buckets[new.bit_count()].add(B)
+        else:
+            for B, b in removals[mark:]:
+                curr[B] |= b
+    else:
+        for B, b in removals[mark:]:
+            csp.curr_domains[B].append(b)
+    del removals[mark:]
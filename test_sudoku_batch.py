@@ -0,0 +1,29 @@
+"""Tests of the process pool in sudoku_batch; run with python -m pytest."""
+import pytest
+
+from sudoku_solver import hidden_singles
+from sudoku_bench import load_corpus
+from sudoku_cli import solve_all
+from sudoku_batch import solve_batch
+
+HARD = '85...24..72......9..4.........1.7..23.5...9...4...........8..7..17..........36.4.'
+
+
+@pytest.mark.parametrize('ordered', [True, False])
+def test_matches_solve_all(ordered):
+    puzzles = load_corpus('medium')[:10] + load_corpus('hard')[:4] + ['88' + HARD[2:]]
+    expected = list(solve_all(puzzles, inference=hidden_singles))
+    results = list(solve_batch(puzzles, processes=2, chunksize=3, ordered=ordered,
+                               inference=hidden_singles))
+    if ordered:
+        assert results == expected
+    else:
+        assert sorted(results, key=str) == sorted(expected, key=str)
+
+
+@pytest.mark.parametrize('ordered', [True, False])
+def test_worker_errors_reach_the_caller(ordered):
+    # A grid with too few cells makes Sudoku.load raise in the worker
+    with pytest.raises(ValueError):
+        list(solve_batch([HARD] * 5 + [HARD[:40]], processes=2, chunksize=2,
+                         ordered=ordered))
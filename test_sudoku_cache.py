@@ -0,0 +1,37 @@
+"""Tests of sudoku_cache; run with python -m pytest."""
+import itertools
+import time
+
+from sudoku_solver import Sudoku, hidden_singles
+from sudoku_cache import SolutionCache, _count_orders, _orders, canonical_form
+
+HARD = '85...24..72......9..4.........1.7..23.5...9...4...........8..7..17..........36.4.'
+
+
+def test_count_orders():
+    for n in (2, 3):
+        for keys in itertools.product(range(2), repeat=n * n):
+            assert _count_orders(keys, n) == len(_orders(keys, n))
+
+
+def test_sparse_boards_give_up_quickly():
+    for n in (3, 4, 5):
+        s = Sudoku('', n=n)
+        start = time.perf_counter()
+        assert canonical_form(s) is None
+        s.load(s.geometry.symbols[0].ljust(s.geometry.ncells, '.'))
+        assert canonical_form(s) is None
+        assert time.perf_counter() - start < 0.1
+
+
+def test_isomorphic_puzzle_is_a_hit():
+    # The transpose, with the digits 1 and 2 swapped
+    swap = str.maketrans('12', '21')
+    copy = ''.join(HARD[c * 9 + r] for r in range(9) for c in range(9)).translate(swap)
+    cache = SolutionCache()
+    s = Sudoku(HARD)
+    first = s.grid_string(cache.solve(s, inference=hidden_singles))
+    s.load(copy)
+    second = s.grid_string(cache.solve(s, inference=hidden_singles))
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert second == ''.join(first[c * 9 + r] for r in range(9) for c in range(9)).translate(swap)
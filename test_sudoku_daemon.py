@@ -0,0 +1,110 @@
+"""Tests of sudoku_daemon, served in-process; run with python -m pytest."""
+import asyncio
+import io
+import json
+import time
+
+import sudoku_daemon
+from sudoku_daemon import SolverDaemon, _StdoutWriter
+
+HARD = '85...24..72......9..4.........1.7..23.5...9...4...........8..7..17..........36.4.'
+
+
+def serve(requests, **daemon_args):
+    """Return the responses of a thread-backed daemon to requests, by id."""
+    async def run():
+        daemon = SolverDaemon(processes=0, **daemon_args)
+        await daemon.start()
+        reader = asyncio.StreamReader()
+        for request in requests:
+            reader.feed_data((request if isinstance(request, str)
+                              else json.dumps(request)).encode() + b'\n')
+        reader.feed_eof()
+        out = io.BytesIO()
+        try:
+            await daemon.serve(reader, _StdoutWriter(out))
+        finally:
+            daemon.close()
+        return out.getvalue()
+    lines = asyncio.run(run()).decode().splitlines()
+    return {r['id']: r for r in map(json.loads, lines)}
+
+
+def test_solves_and_reports():
+    responses = serve([dict(id=1, puzzle=HARD, inference='singles'),
+                       dict(id=2, puzzle='11' + HARD[2:]),
+                       dict(id=3, puzzle=HARD, select='first', inference='none',
+                            timeout=0.05)])
+    assert responses[1]['status'] == 'solved'
+    assert responses[2]['status'] == 'unsolvable'
+    assert responses[3]['status'] == 'timeout'
+
+
+def test_bad_requests_get_errors():
+    responses = serve(['not json',
+                       dict(id=1, puzzle=HARD, select='nope'),
+                       dict(id=2, puzzle='', n=6),
+                       dict(id=3, puzzle='', n='3'),
+                       dict(id=4, puzzle=HARD)])
+    assert responses[None]['status'] == 'error'
+    for i in (1, 2, 3):
+        assert responses[i]['status'] == 'error'
+    assert responses[4]['status'] == 'solved'
+
+
+def test_worker_failure_is_answered(monkeypatch):
+    def fail(*args):
+        raise RuntimeError('worker died')
+    monkeypatch.setattr(sudoku_daemon, '_solve_request', fail)
+    responses = serve([dict(id=1, puzzle=HARD), dict(id=2, op='stats')])
+    assert responses[1]['status'] == 'error'
+    assert 'worker died' in responses[1]['error']
+    assert responses[2]['status'] == 'ok'
+
+
+def test_idle_connections_hold_no_slot():
+    async def run():
+        daemon = SolverDaemon(processes=0, max_inflight=2)
+        await daemon.start()
+        idle = [asyncio.StreamReader() for _ in range(2)]
+        serving = [asyncio.create_task(daemon.serve(reader, _StdoutWriter(io.BytesIO())))
+                   for reader in idle]
+        reader = asyncio.StreamReader()
+        reader.feed_data(json.dumps(dict(id=1, puzzle=HARD)).encode() + b'\n')
+        reader.feed_data(json.dumps(dict(id=2, op='stats')).encode() + b'\n')
+        reader.feed_eof()
+        out = io.BytesIO()
+        try:
+            await asyncio.wait_for(daemon.serve(reader, _StdoutWriter(out)), 5)
+        finally:
+            for r in idle:
+                r.feed_eof()
+            await asyncio.gather(*serving)
+            daemon.close()
+        return out.getvalue()
+    responses = {r['id']: r for r in map(json.loads, asyncio.run(run()).splitlines())}
+    assert responses[1]['status'] == 'solved'
+    assert responses[2]['stats']['waiting'] == 0
+
+
+def test_timed_out_work_keeps_its_slot(monkeypatch):
+    def slow(*args):
+        time.sleep(1.2)
+        return None, 0
+    monkeypatch.setattr(sudoku_daemon, '_solve_request', slow)
+
+    async def run():
+        daemon = SolverDaemon(processes=0, max_inflight=1)
+        await daemon.start()
+        try:
+            await daemon.acquire()
+            response = await daemon.handle(dict(puzzle=HARD, timeout=0.01),
+                                           time.perf_counter())
+            assert response['status'] == 'timeout'
+            # The worker is still busy, so its slot is still taken
+            assert daemon.slots.locked()
+            await asyncio.sleep(0.5)
+            assert not daemon.slots.locked()
+        finally:
+            daemon.close()
+    asyncio.run(run())
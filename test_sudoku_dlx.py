@@ -0,0 +1,32 @@
+"""Tests of the exact-cover backend in sudoku_dlx; run with python -m pytest."""
+from sudoku_solver import Sudoku, solve
+from sudoku_dlx import dlx_search
+
+HARD = '85...24..72......9..4.........1.7..23.5...9...4...........8..7..17..........36.4.'
+SOLVED = '859612437723854169164379528986147352375268914241593786432981675617425893598736241'
+
+
+def valid(s, result):
+    """Return True if result fills every unit of s with distinct symbols."""
+    return all(len({result[v] for v in unit}) == s.geometry.size for unit in s.geometry.units)
+
+
+def test_known_puzzle():
+    s = Sudoku(HARD)
+    assert s.grid_string(solve(s, backend='dlx')) == SOLVED
+    assert s.stats.nodes > 0
+
+
+def test_contradiction():
+    # Two 8s in the first row
+    assert solve(Sudoku('88' + HARD[2:]), backend='dlx') is None
+    # No clue repeats, but the last cell of the first row can only be a 9,
+    # which is already in its column
+    assert dlx_search(Sudoku('12345678.' + '........9' + '.' * 63)) is None
+
+
+def test_other_box_sizes():
+    for n in (2, 4):
+        s = Sudoku('', n=n)
+        result = dlx_search(s)
+        assert len(result) == s.geometry.ncells and valid(s, result)
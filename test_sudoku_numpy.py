@@ -0,0 +1,39 @@
+"""Tests of the batch propagation in sudoku_numpy; run with python -m pytest."""
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from sudoku_solver import Sudoku
+from sudoku_bench import load_corpus
+from sudoku_cli import solve_all
+from sudoku_numpy import grid_masks, popcount, propagate, solve_vectorised, solved_strings
+
+HARD = '85...24..72......9..4.........1.7..23.5...9...4...........8..7..17..........36.4.'
+
+
+def test_repeated_givens_are_not_ok():
+    masks, ok = propagate(grid_masks(['88' + HARD[2:], HARD]))
+    assert ok.tolist() == [False, True]
+
+
+def test_easy_corpus_needs_no_search():
+    # Every easy puzzle but one is solved by singles alone; for all of them
+    # the batch reaches the same fixpoint as Sudoku.propagate
+    puzzles = load_corpus('easy')
+    masks, ok = propagate(grid_masks(puzzles))
+    solved = (popcount(masks) == 1).all(axis=1)
+    assert ok.all() and solved.sum() == len(puzzles) - 1
+    for puzzle, row in zip(puzzles, masks.tolist()):
+        s = Sudoku(puzzle)
+        s.support_pruning()
+        assert s.propagate([v for v in s.variables if s.domains[v].bit_count() == 1],
+                           s.trail, hidden=True)
+        assert s.curr_domains == row
+    expected = [solution for (_, solution), done in zip(solve_all(puzzles), solved) if done]
+    assert solved_strings(masks[solved]) == expected
+
+
+def test_vectorised_matches_solve_all():
+    puzzles = [p for name in ('easy', 'medium', 'hard', '17clue') for p in load_corpus(name)[:5]]
+    puzzles += ['88' + HARD[2:], '12345678.' + '........9' + '.' * 63]
+    assert list(solve_vectorised(puzzles, batch=7)) == list(solve_all(puzzles))
@@ -0,0 +1,33 @@
+"""Tests of sudoku_packed; run with python -m pytest."""
+import pytest
+
+from sudoku_solver import Sudoku, backtracking_search
+from sudoku_packed import HEADER, MAGIC, PackedCorpus, pack, unpack, write_packed
+
+HARD = '85...24..72......9..4.........1.7..23.5...9...4...........8..7..17..........36.4.'
+SOLVED = '859612437723854169164379528986147352375268914241593786432981675617425893598736241'
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / 'corpus.sdkp'
+    with open(path, 'wb') as f:
+        assert write_packed(f, [(HARD, SOLVED), (SOLVED, None)], solutions=True) == 2
+    with PackedCorpus(path) as corpus:
+        assert len(corpus) == 2 and corpus.n == 3
+        assert unpack(corpus[0]) == HARD and unpack(corpus.solution(0)) == SOLVED
+        assert corpus.solution(1) is None
+        s = Sudoku('')
+        s.load_packed(corpus[0])
+        assert s.grid_string(backtracking_search(s)) == SOLVED
+    assert len(pack(HARD)) == 41
+
+
+@pytest.mark.parametrize('header', [b'', b'SDKQ\x01\x03\x00\x00',
+                                    HEADER.pack(MAGIC, 1, 4, 0, 0),
+                                    HEADER.pack(MAGIC, 1, 0, 0, 0),
+                                    HEADER.pack(MAGIC, 1, 3, 0, 0) + b'\x00'])
+def test_bad_corpus(tmp_path, header):
+    path = tmp_path / 'bad.sdkp'
+    path.write_bytes(header)
+    with pytest.raises(ValueError):
+        PackedCorpus(path)
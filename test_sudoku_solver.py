@@ -0,0 +1,118 @@
+"""Tests of the search in sudoku_solver; run with python -m pytest."""
+import pytest
+
+from sudoku_solver import (MAX_BOX_SIZE, BUDGET_EXCEEDED, Sudoku, backtracking_search,
+                           count_solutions, forward_checking, geometry, has_unique_solution,
+                           hidden_singles, incremental_mrv, no_inference, percentile,
+                           restarting_search)
+
+HARD = '85...24..72......9..4.........1.7..23.5...9...4...........8..7..17..........36.4.'
+SOLVED = '859612437723854169164379528986147352375268914241593786432981675617425893598736241'
+
+
+def test_on_prune_without_profile():
+    s = Sudoku(HARD)
+    calls = []
+    result = backtracking_search(s, on_prune=lambda *args: calls.append(args))
+    assert s.grid_string(result) == SOLVED
+    assert calls
+    assert s.stats.pruned is None and s.stats.propagate_time is None
+
+
+def test_profile_counts_pruned_values():
+    for bitset in (True, False):
+        s = Sudoku(HARD, bitset=bitset)
+        result = backtracking_search(s, inference=hidden_singles, profile=True)
+        assert s.grid_string(result) == SOLVED
+        assert s.stats.pruned > 0
+        assert 0 <= s.stats.propagate_time <= s.stats.time
+        assert s.stats.branch_time >= 0
+
+
+def test_hooks_follow_the_search():
+    s = Sudoku(HARD)
+    assigned, pruned, undone = [], [], []
+    result = backtracking_search(
+        s, inference=forward_checking, profile=True,
+        on_assign=lambda var, value, assignment: assigned.append(var),
+        on_prune=lambda var, value, removals: pruned.append(len(removals)),
+        on_backtrack=lambda var, value, assignment: undone.append(var))
+    assert s.grid_string(result) == SOLVED
+    # Every assignment is either kept or taken back
+    assert len(assigned) - len(undone) == len(result)
+    assert len(undone) == s.stats.backtracks
+    # Each assignment that survives inference leads to one more node
+    assert len(pruned) == s.stats.nodes - 1
+    assert sum(pruned) <= s.stats.pruned
+
+
+def test_stats_without_hooks():
+    s = Sudoku(HARD)
+    backtracking_search(s)
+    assert s.stats.nodes > s.stats.max_depth > 0
+    assert s.stats.pruned is None and s.stats.branch_time is None
+
+
+def test_box_sizes():
+    for n in (1, MAX_BOX_SIZE + 1):
+        with pytest.raises(ValueError):
+            Sudoku('', n=n)
+    s = Sudoku('', n=MAX_BOX_SIZE)
+    result = backtracking_search(s, inference=hidden_singles)
+    assert len(result) == geometry(MAX_BOX_SIZE).ncells
+
+
+def test_count_solutions_stops_at_limit():
+    for limit in (1, 2, 3, 10):
+        assert count_solutions(Sudoku(''), limit) == limit
+    assert count_solutions(Sudoku(HARD), 5) == 1
+    assert has_unique_solution(Sudoku(HARD))
+    # Two symbols are given twice in the first row
+    assert count_solutions(Sudoku('88' + HARD[2:])) == 0
+    # Four cells of the solution that hold the same two symbols, in two
+    # rows and two boxes, can be filled either way round
+    two = list(SOLVED)
+    for i in (10, 16, 19, 25):
+        two[i] = '.'
+    assert count_solutions(Sudoku(''.join(two)), 3) == 2
+    assert not has_unique_solution(Sudoku(''.join(two)))
+
+
+def test_restarts_share_one_budget():
+    s = Sudoku(HARD)
+    result = restarting_search(s, restart_unit=10, max_nodes=200, inference=no_inference)
+    assert result is BUDGET_EXCEEDED and not result
+    assert s.stats.nodes <= 200 and s.stats.restarts > 0
+    result = restarting_search(s, restart_unit=10, inference=hidden_singles)
+    assert s.grid_string(result) == SOLVED
+    with pytest.raises(ValueError):
+        restarting_search(s, select_unassigned_variable=incremental_mrv)
+
+
+def test_count_solutions_can_be_stopped():
+    class Stop(Exception):
+        pass
+
+    def on_assign(var, value, assignment):
+        if len(assignment) > 40:
+            raise Stop
+    s = Sudoku('')
+    with pytest.raises(Stop):
+        count_solutions(s, on_assign=on_assign)
+    assert s.stats.nodes > 40 and s.stats.time > 0
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert [percentile(values, p) for p in (0, 1, 50, 99, 100)] == [1, 1, 50, 99, 100]
+    assert percentile([7], 50) == 7 and percentile([], 50) is None
+
+
+def test_grids_give_every_cell():
+    for grid in (HARD[:40], HARD + '1'):
+        with pytest.raises(ValueError):
+            Sudoku(grid)
+    s = Sudoku('', n=4)
+    solution = s.grid_string(backtracking_search(s, inference=hidden_singles))
+    s = Sudoku(solution.lower(), n=4)
+    assert s.grid_string(backtracking_search(s)) == solution